@@ -0,0 +1,102 @@
+# Generates the resource sharing variant (AVM v9) of the swap router approval program.
+# The variant is the same source with the "resources" method and the route functions below, it must be regenerated after the source changes.
+# The route assets and pools are read from the foreign arrays of the app call and the consecutive "resources" app calls after it.
+# Usage: python contracts/swap_router/generate_resource_sharing_source.py
+
+SOURCE_PATH = "contracts/swap_router/swap_router_approval.tl"
+OUTPUT_PATH = "contracts/swap_router/swap_router_approval_resource_sharing.tl"
+
+ROUTE_FUNCTIONS = """func get_route_asset_id(index: int) int:
+    # Returns Txn.Assets[index].
+    # The foreign assets of the app call and the "resources" app calls after it are indexed as a single array.
+    int txn_index = Txn.GroupIndex
+    while index >= Gtxn[txn_index].NumAssets:
+        index = index - Gtxn[txn_index].NumAssets
+        txn_index = txn_index + 1
+        assert(is_resources_txn(txn_index))
+    end
+    return Gtxn[txn_index].Assets[index]
+end
+
+func get_route_pool_address(index: int) bytes:
+    # Returns Txn.Accounts[index].
+    # The foreign accounts of the app call and the "resources" app calls after it are indexed as a single array.
+    # The index 0 is the sender and the foreign accounts of each transaction start at 1.
+    int txn_index = Txn.GroupIndex
+    while index > Gtxn[txn_index].NumAccounts:
+        index = index - Gtxn[txn_index].NumAccounts
+        txn_index = txn_index + 1
+        assert(is_resources_txn(txn_index))
+    end
+    return Gtxn[txn_index].Accounts[index]
+end
+
+func get_route_asset_count() int:
+    int asset_count = Txn.NumAssets
+    int txn_index = Txn.GroupIndex + 1
+    while is_resources_txn(txn_index):
+        asset_count = asset_count + Gtxn[txn_index].NumAssets
+        txn_index = txn_index + 1
+    end
+    return asset_count
+end
+
+func get_route_pool_count() int:
+    int pool_count = Txn.NumAccounts
+    int txn_index = Txn.GroupIndex + 1
+    while is_resources_txn(txn_index):
+        pool_count = pool_count + Gtxn[txn_index].NumAccounts
+        txn_index = txn_index + 1
+    end
+    return pool_count
+end
+
+func is_resources_txn(txn_index: int) int:
+    # The references of an app call are extended by the consecutive "resources" app calls to this app.
+    if txn_index >= Global.GroupSize:
+        return 0
+    end
+    if Gtxn[txn_index].TypeEnum != Appl:
+        return 0
+    end
+    if Gtxn[txn_index].ApplicationID != Global.CurrentApplicationID:
+        return 0
+    end
+    if !Gtxn[txn_index].NumAppArgs:
+        return 0
+    end
+    return Gtxn[txn_index].ApplicationArgs[0] == "resources"
+end
+
+"""
+
+RESOURCES_BLOCK = """    block resources:
+        # Carries the foreign array references of the swap app call.
+        exit(1)
+    end
+
+"""
+
+
+def generate_resource_sharing_source(source):
+    start = source.index("func get_route_asset_id(index: int) int:")
+    end = source.index("func swap_fixed_input_route(")
+    source = source[:start] + ROUTE_FUNCTIONS + source[end:]
+
+    replacements = [
+        ("#pragma version 7\n", "#pragma version 9\n"),
+        ('        "quote": quote\n', '        "quote": quote\n        "resources": resources\n'),
+        ("    block asset_opt_in:\n", RESOURCES_BLOCK + "    block asset_opt_in:\n"),
+    ]
+    for old, new in replacements:
+        assert source.count(old) == 1, old
+        source = source.replace(old, new)
+    return source
+
+
+if __name__ == "__main__":
+    with open(SOURCE_PATH) as f:
+        source = f.read()
+
+    with open(OUTPUT_PATH, "w") as f:
+        f.write(generate_resource_sharing_source(source))
@@ -0,0 +1,4 @@
+"""
+Off-chain tools for the Tinyman Swap Router.
+The calculations mirror the contract (contracts/swap_router/swap_router_approval.tl), they must be updated together.
+"""
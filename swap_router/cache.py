@@ -0,0 +1,77 @@
+"""
+Pool state cache keyed by pool address.
+Each entry keeps the round it was read at, the least recently used entries are evicted when the cache is full.
+"""
+from collections import OrderedDict, namedtuple
+
+from swap_router.quote import PoolState
+
+CacheEntry = namedtuple("CacheEntry", ["pool", "round"])
+
+POOL_STATE_KEYS = ["asset_1_id", "asset_2_id", "asset_1_reserves", "asset_2_reserves", "total_fee_share"]
+
+
+def get_pool_state_from_local_state(local_state):
+    # local_state is the AMM app local state of the pool account, the keys can be bytes or str.
+    # Missing keys are 0 as in app_local_get_ex.
+    return PoolState(*[local_state.get(key.encode(), local_state.get(key, 0)) for key in POOL_STATE_KEYS])
+
+
+class PoolStateCache:
+
+    def __init__(self, max_size=10000, max_age=None):
+        # max_age is the number of rounds an entry is fresh, None means the entries don't expire.
+        self.max_size = max_size
+        self.max_age = max_age
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, pool_address):
+        return pool_address in self.entries
+
+    def set(self, pool_address, pool, round):
+        # The state of an older round doesn't replace the cached state.
+        entry = self.entries.get(pool_address)
+        if entry is not None and entry.round > round:
+            return False
+
+        self.entries[pool_address] = CacheEntry(pool, round)
+        self.entries.move_to_end(pool_address)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return True
+
+    def get_entry(self, pool_address):
+        entry = self.entries.get(pool_address)
+        if entry is not None:
+            self.entries.move_to_end(pool_address)
+        return entry
+
+    def get(self, pool_address, current_round=None, max_age=None):
+        # Returns the pool state if it is cached and fresh, otherwise None.
+        entry = self.get_entry(pool_address)
+        if entry is None or not self.is_fresh_entry(entry, current_round, max_age):
+            return None
+        return entry.pool
+
+    def is_fresh(self, pool_address, current_round, max_age=None):
+        entry = self.entries.get(pool_address)
+        return entry is not None and self.is_fresh_entry(entry, current_round, max_age)
+
+    def is_fresh_entry(self, entry, current_round, max_age=None):
+        if max_age is None:
+            max_age = self.max_age
+        if max_age is None or current_round is None:
+            return True
+        return current_round - entry.round <= max_age
+
+    def get_stale_pool_addresses(self, current_round, max_age=None):
+        return [pool_address for pool_address, entry in self.entries.items() if not self.is_fresh_entry(entry, current_round, max_age)]
+
+    def invalidate(self, pool_address):
+        self.entries.pop(pool_address, None)
+
+    def clear(self):
+        self.entries.clear()
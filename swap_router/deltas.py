@@ -0,0 +1,79 @@
+"""
+Applies the AMM local state deltas of evaluated blocks to the pool state cache.
+The block format is the msgpack format of algod (GET /v2/blocks/{round}?format=msgpack) and JigLedger.eval_transactions.
+"""
+from algosdk.encoding import encode_address
+
+from swap_router.cache import POOL_STATE_KEYS
+
+# Delta actions
+SET_BYTES = 1
+SET_UINT = 2
+DELETE = 3
+
+
+def iter_transactions(txns):
+    # Yields the transactions and their inner transactions in the evaluation order.
+    for txn in txns:
+        yield txn
+        yield from iter_transactions(txn.get(b'dt', {}).get(b'itx', []))
+
+
+def get_local_state_deltas(txn, app_id):
+    # Returns {address: {key: value}} for the local state changes of the app call, deleted keys are 0.
+    # The account index of the delta is 0 for the sender and i for the foreign account i - 1.
+    txn_fields = txn[b'txn']
+    local_deltas = txn.get(b'dt', {}).get(b'ld')
+    if txn_fields.get(b'type') != b'appl' or txn_fields.get(b'apid') != app_id or not local_deltas:
+        return {}
+
+    accounts = [txn_fields[b'snd']] + txn_fields.get(b'apat', [])
+    deltas = {}
+    for account_index, key_deltas in local_deltas.items():
+        state = deltas.setdefault(encode_address(accounts[account_index]), {})
+        for key, value_delta in key_deltas.items():
+            action = value_delta.get(b'at')
+            if action == SET_UINT:
+                state[key] = value_delta.get(b'ui', 0)
+            elif action == SET_BYTES:
+                state[key] = value_delta.get(b'bs', b'')
+            elif action == DELETE:
+                state[key] = 0
+    return deltas
+
+
+class PoolStateUpdater:
+
+    def __init__(self, cache, app_id, max_rounds=1000):
+        # cache is a PoolStateCache, app_id is the Tinyman AMM V2 app id.
+        # The changed pools of the last max_rounds rounds are kept, the older rounds are dropped if they are not popped.
+        self.cache = cache
+        self.app_id = app_id
+        self.max_rounds = max_rounds
+        self.changed_pools = {}
+
+    def apply_block(self, block, round=None):
+        # Updates the cached pool states and returns the addresses of the changed pools.
+        # The pools which are not in the cache are not added, the deltas don't contain the whole state.
+        # The algod response wraps the block with the certificate.
+        block = block.get(b'block', block)
+        if round is None:
+            round = block[b'rnd']
+
+        changed_pool_addresses = set()
+        for txn in iter_transactions(block.get(b'txns', [])):
+            for pool_address, state_delta in get_local_state_deltas(txn, self.app_id).items():
+                changed_pool_addresses.add(pool_address)
+                entry = self.cache.get_entry(pool_address)
+                if entry is None:
+                    continue
+                changes = {key: state_delta[key.encode()] for key in POOL_STATE_KEYS if key.encode() in state_delta}
+                self.cache.set(pool_address, entry.pool._replace(**changes), round)
+
+        self.changed_pools[round] = changed_pool_addresses
+        while len(self.changed_pools) > self.max_rounds:
+            del self.changed_pools[next(iter(self.changed_pools))]
+        return changed_pool_addresses
+
+    def pop_changed_pools(self, round):
+        return self.changed_pools.pop(round, set())
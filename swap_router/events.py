@@ -0,0 +1,95 @@
+"""
+Decoders of the swap router ARC-28 event logs.
+The selectors and the struct layouts are prepared once, batches of logs are joined and unpacked with a single struct call.
+"""
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from algosdk.encoding import checksum
+
+# The struct formats are also the array typecodes of the columns.
+ARG_FORMATS = {
+    "uint8": "B",
+    "uint64": "Q",
+}
+
+
+def get_event_selector(signature):
+    # The first 4 bytes of SHA-512/256 of the event signature.
+    return checksum(signature.encode())[:4]
+
+
+class EventDecoder:
+
+    def __init__(self, name, args):
+        # args is a list of (type, name).
+        self.name = name
+        self.signature = "{}({})".format(name, ",".join(arg_type for arg_type, _ in args))
+        self.selector = get_event_selector(self.signature)
+        self.struct = struct.Struct(">" + "".join(ARG_FORMATS[arg_type] for arg_type, _ in args))
+        # The same layout with the selector, it is used to unpack the joined logs.
+        self.log_struct = struct.Struct(">4x" + "".join(ARG_FORMATS[arg_type] for arg_type, _ in args))
+        self.size = self.log_struct.size
+        self.record_type = namedtuple(name.title().replace("_", "") + "Event", [arg_name for _, arg_name in args])
+        self.typecodes = [ARG_FORMATS[arg_type] for arg_type, _ in args]
+        self.is_uint64_only = all(arg_type == "uint64" for arg_type, _ in args)
+        # The layouts that skip the other args of the log, a column is unpacked from the joined logs with a single struct call.
+        self.column_structs = []
+        offset = 4
+        for arg_type, _ in args:
+            arg_size = struct.calcsize(">" + ARG_FORMATS[arg_type])
+            self.column_structs.append(struct.Struct(">{}x{}{}x".format(offset, ARG_FORMATS[arg_type], self.size - offset - arg_size)))
+            offset += arg_size
+
+    def match(self, log):
+        return len(log) == self.size and log.startswith(self.selector)
+
+    def decode(self, log):
+        # Returns a tuple of the event args or None if the log is another event.
+        if not self.match(log):
+            return None
+        return self.struct.unpack_from(log, 4)
+
+    def join(self, logs, offset=0):
+        # Returns the matching logs as a single bytes object, memoryview slices don't copy the logs before the join.
+        size = self.size
+        selector = self.selector
+        return b"".join(memoryview(log)[offset:] for log in logs if len(log) == size and log.startswith(selector))
+
+    def decode_many(self, logs):
+        # Returns a list of tuples for the matching logs.
+        return list(self.log_struct.iter_unpack(self.join(logs)))
+
+    def decode_columns(self, logs):
+        # Returns a column for each event arg, uint8 columns are array("B") and uint64 columns are array("Q").
+        if self.is_uint64_only:
+            values = array("Q")
+            values.frombytes(self.join(logs, offset=4))
+            if sys.byteorder == "little":
+                values.byteswap()
+            field_count = len(self.record_type._fields)
+            return self.record_type(*[values[i::field_count] for i in range(field_count)])
+
+        data = self.join(logs)
+        return self.record_type(*[
+            array(typecode, (value for value, in column_struct.iter_unpack(data)))
+            for typecode, column_struct in zip(self.typecodes, self.column_structs)
+        ])
+
+
+swap_event = EventDecoder("swap", [("uint64", "input_asset_id"), ("uint64", "output_asset_id"), ("uint64", "input_amount"), ("uint64", "output_amount")])
+swap_hop_event = EventDecoder("swap_hop", [("uint8", "pool_index"), ("uint64", "input_asset_id"), ("uint64", "output_asset_id"), ("uint64", "input_amount"), ("uint64", "output_amount")])
+arbitrage_event = EventDecoder("arbitrage", [("uint64", "asset_id"), ("uint64", "input_amount"), ("uint64", "output_amount"), ("uint64", "profit_amount")])
+quote_event = EventDecoder("quote", [("uint64", "input_asset_id"), ("uint64", "output_asset_id"), ("uint64", "input_amount"), ("uint64", "output_amount")])
+
+EVENT_DECODERS = {decoder.selector: decoder for decoder in [swap_event, swap_hop_event, arbitrage_event, quote_event]}
+
+
+def decode_logs(logs):
+    # Yields (event name, args) for the router events, the other logs are skipped.
+    for log in logs:
+        decoder = EVENT_DECODERS.get(log[:4])
+        if decoder is not None and len(log) == decoder.size:
+            yield decoder.name, decoder.struct.unpack_from(log, 4)
@@ -0,0 +1,91 @@
+"""
+Pool graph for route finding. Assets are the nodes and pools are the edges.
+Pools are keyed by the asset pair sorted as in the pool logicsig (asset_1_id > asset_2_id).
+"""
+import heapq
+from collections import namedtuple
+
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT, SwapError, get_route_hops, quote_fixed_input, quote_fixed_output
+
+# asset_ids are the route assets from the input asset to the output asset, pools are the PoolStates of the hops.
+Route = namedtuple("Route", ["asset_ids", "pools"])
+RouteQuote = namedtuple("RouteQuote", ["route", "quote"])
+
+
+def get_pool_key(asset_a_id, asset_b_id):
+    # The same order with the pool logicsig, asset_1_id > asset_2_id.
+    if asset_a_id > asset_b_id:
+        return asset_a_id, asset_b_id
+    return asset_b_id, asset_a_id
+
+
+class PoolGraph:
+
+    def __init__(self, pools=()):
+        self.pools = {}
+        self.neighbors = {}
+        for pool in pools:
+            self.add_pool(pool)
+
+    def __len__(self):
+        return len(self.pools)
+
+    def add_pool(self, pool):
+        # Adds or updates the pool, pool is a PoolState.
+        key = get_pool_key(pool.asset_1_id, pool.asset_2_id)
+        self.pools[key] = pool
+        self.neighbors.setdefault(key[0], set()).add(key[1])
+        self.neighbors.setdefault(key[1], set()).add(key[0])
+
+    def remove_pool(self, asset_a_id, asset_b_id):
+        key = get_pool_key(asset_a_id, asset_b_id)
+        del self.pools[key]
+        self.neighbors[key[0]].discard(key[1])
+        self.neighbors[key[1]].discard(key[0])
+
+    def get_pool(self, asset_a_id, asset_b_id):
+        return self.pools.get(get_pool_key(asset_a_id, asset_b_id))
+
+    def get_routes(self, input_asset_id, output_asset_id):
+        # Returns the direct route and the routes with an intermediary asset.
+        routes = []
+        direct_pool = self.get_pool(input_asset_id, output_asset_id)
+        if direct_pool is not None:
+            routes.append(Route((input_asset_id, output_asset_id), (direct_pool,)))
+
+        input_neighbors = self.neighbors.get(input_asset_id, set())
+        output_neighbors = self.neighbors.get(output_asset_id, set())
+        if len(input_neighbors) > len(output_neighbors):
+            intermediary_asset_ids = output_neighbors & input_neighbors
+        else:
+            intermediary_asset_ids = input_neighbors & output_neighbors
+
+        for intermediary_asset_id in intermediary_asset_ids:
+            routes.append(
+                Route(
+                    (input_asset_id, intermediary_asset_id, output_asset_id),
+                    (self.get_pool(input_asset_id, intermediary_asset_id), self.get_pool(intermediary_asset_id, output_asset_id))
+                )
+            )
+        return routes
+
+    def get_best_routes(self, input_asset_id, output_asset_id, amount, mode=FIXED_INPUT, k=1):
+        # Returns the top k routes, the highest output amount for fixed-input and the lowest input amount for fixed-output.
+        # The routes that would fail are skipped.
+        route_quotes = []
+        for route in self.get_routes(input_asset_id, output_asset_id):
+            hops = get_route_hops(route.pools, route.asset_ids)
+            try:
+                if mode == FIXED_INPUT:
+                    route_quote = quote_fixed_input(hops, amount)
+                elif mode == FIXED_OUTPUT:
+                    route_quote = quote_fixed_output(hops, amount)
+                else:
+                    raise ValueError("unknown mode: {}".format(mode))
+            except SwapError:
+                continue
+            route_quotes.append(RouteQuote(route, route_quote))
+
+        if mode == FIXED_INPUT:
+            return heapq.nlargest(k, route_quotes, key=lambda r: r.quote.output_amount)
+        return heapq.nsmallest(k, route_quotes, key=lambda r: r.quote.input_amount)
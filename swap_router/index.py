@@ -0,0 +1,108 @@
+"""
+Persistent index of the Tinyman AMM V2 pools keyed by the asset pair.
+The index file is a header followed by fixed size records, it is loaded into a dict for O(1) lookups.
+"""
+import os
+import struct
+from collections import namedtuple
+
+from algosdk.encoding import decode_address
+
+from swap_router.graph import get_pool_key
+from swap_router.pools import PoolAddressDeriver, encode_address
+
+# magic, version, app id, record count
+INDEX_HEADER_STRUCT = struct.Struct(">4sHQQ")
+# asset_1_id, asset_2_id, pool address, pool token asset id
+INDEX_RECORD_STRUCT = struct.Struct(">QQ32sQ")
+INDEX_MAGIC = b"TMPI"
+INDEX_VERSION = 1
+
+PoolIndexEntry = namedtuple("PoolIndexEntry", ["pool_address", "pool_token_asset_id"])
+
+
+class PoolIndexError(Exception):
+    """ The index file is invalid. """
+
+
+class PoolIndex:
+
+    def __init__(self, app_id, deriver=None):
+        self.app_id = app_id
+        self.deriver = deriver or PoolAddressDeriver(app_id)
+        # (asset_1_id, asset_2_id) -> PoolIndexEntry
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, pair):
+        return get_pool_key(*pair) in self.entries
+
+    def has_pool(self, asset_a_id, asset_b_id):
+        return get_pool_key(asset_a_id, asset_b_id) in self.entries
+
+    def get(self, asset_a_id, asset_b_id):
+        # Returns the PoolIndexEntry or None if there isn't a pool.
+        return self.entries.get(get_pool_key(asset_a_id, asset_b_id))
+
+    def add(self, asset_a_id, asset_b_id, pool_token_asset_id, pool_address=None):
+        # The pool address is derived if it is not given.
+        key = get_pool_key(asset_a_id, asset_b_id)
+        if pool_address is None:
+            pool_address = self.deriver.get_pool_address(*key)
+        self.entries[key] = PoolIndexEntry(pool_address, pool_token_asset_id)
+
+    def add_local_state(self, pool_address, local_state):
+        # local_state is the AMM app local state of the pool account, the keys can be bytes or str.
+        # The accounts that are not the pool of their asset pair are skipped, the pools that are not bootstrapped don't have a pool token.
+        asset_1_id, asset_2_id, pool_token_asset_id = [
+            local_state.get(key.encode(), local_state.get(key, 0)) for key in ["asset_1_id", "asset_2_id", "pool_token_asset_id"]
+        ]
+        if not pool_token_asset_id or self.deriver.get_pool_address(asset_1_id, asset_2_id) != pool_address:
+            return False
+        self.add(asset_1_id, asset_2_id, pool_token_asset_id, pool_address=pool_address)
+        return True
+
+    def remove(self, asset_a_id, asset_b_id):
+        self.entries.pop(get_pool_key(asset_a_id, asset_b_id), None)
+
+    def to_bytes(self):
+        records = [
+            INDEX_RECORD_STRUCT.pack(asset_1_id, asset_2_id, decode_address(entry.pool_address), entry.pool_token_asset_id)
+            for (asset_1_id, asset_2_id), entry in sorted(self.entries.items())
+        ]
+        return INDEX_HEADER_STRUCT.pack(INDEX_MAGIC, INDEX_VERSION, self.app_id, len(records)) + b"".join(records)
+
+    @classmethod
+    def from_bytes(cls, data, app_id=None):
+        # app_id is the expected app id of the index, None means any.
+        if len(data) < INDEX_HEADER_STRUCT.size:
+            raise PoolIndexError("index is too short")
+        magic, version, index_app_id, count = INDEX_HEADER_STRUCT.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise PoolIndexError("unknown index format")
+        if app_id is not None and index_app_id != app_id:
+            raise PoolIndexError("index app id {} is not {}".format(index_app_id, app_id))
+        if len(data) != INDEX_HEADER_STRUCT.size + count * INDEX_RECORD_STRUCT.size:
+            raise PoolIndexError("index size doesn't match the record count")
+
+        index = cls(index_app_id)
+        index.entries = {
+            (asset_1_id, asset_2_id): PoolIndexEntry(encode_address(pool_address), pool_token_asset_id)
+            for asset_1_id, asset_2_id, pool_address, pool_token_asset_id
+            in INDEX_RECORD_STRUCT.iter_unpack(memoryview(data)[INDEX_HEADER_STRUCT.size:])
+        }
+        return index
+
+    def save(self, path):
+        # The file is replaced atomically, a reader never sees a partial index.
+        temp_path = "{}.tmp".format(path)
+        with open(temp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, app_id=None):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read(), app_id=app_id)
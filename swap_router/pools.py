@@ -0,0 +1,99 @@
+"""
+Pool address derivation of Tinyman AMM V2.
+The pool logicsig template is validated once, the app id and the asset ids are patched into a preallocated buffer for each pair.
+"""
+import hashlib
+import struct
+from base64 import b32encode
+
+from algosdk.constants import logic_prefix
+from algosdk.encoding import checksum
+from algosdk.future import transaction
+
+from swap_router.graph import get_pool_key
+
+# These are the bytes of the logicsig template. This needs to be updated if the logicsig is updated.
+POOL_LOGICSIG_TEMPLATE = b'\x06\x80\x18\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x81\x00[5\x004\x001\x18\x12D1\x19\x81\x01\x12D\x81\x01C'
+
+# program[3:11] is the app id, program[11:19] is asset_1_id and program[19:27] is asset_2_id.
+APP_ID_OFFSET = 3
+ASSET_IDS_OFFSET = 11
+ASSET_IDS_STRUCT = struct.Struct(">QQ")
+
+try:
+    hashlib.new("sha512_256")
+except ValueError:
+    # OpenSSL doesn't provide SHA-512/256, the algosdk implementation is used.
+    sha512_256 = checksum
+else:
+    def sha512_256(data):
+        return hashlib.new("sha512_256", data).digest()
+
+
+def encode_address(address):
+    # The same as algosdk.encoding.encode_address, the checksum of the address is the last 4 bytes of its hash.
+    return b32encode(address + sha512_256(address)[-4:]).decode().rstrip("=")
+
+
+def get_program_address(data):
+    # The same as algosdk.encoding.encode_address(checksum(data)).
+    return encode_address(sha512_256(data))
+
+
+def get_pool_program(app_id, asset_1_id, asset_2_id):
+    program = bytearray(POOL_LOGICSIG_TEMPLATE)
+    program[APP_ID_OFFSET:ASSET_IDS_OFFSET] = app_id.to_bytes(8, 'big')
+    ASSET_IDS_STRUCT.pack_into(program, ASSET_IDS_OFFSET, asset_1_id, asset_2_id)
+    return bytes(program)
+
+
+class PoolAddressDeriver:
+
+    def __init__(self, app_id, template=POOL_LOGICSIG_TEMPLATE):
+        if bytes(template) != POOL_LOGICSIG_TEMPLATE:
+            raise ValueError("unknown pool logicsig template")
+
+        # The address is the checksum of "Program" + program.
+        self.app_id = app_id
+        self.offset = len(logic_prefix)
+        self.buffer = bytearray(logic_prefix + POOL_LOGICSIG_TEMPLATE)
+        self.buffer[self.offset + APP_ID_OFFSET:self.offset + ASSET_IDS_OFFSET] = app_id.to_bytes(8, 'big')
+        # (asset_1_id, asset_2_id) -> pool address
+        self.addresses = {}
+
+    def get_program(self, asset_a_id, asset_b_id):
+        asset_1_id, asset_2_id = get_pool_key(asset_a_id, asset_b_id)
+        ASSET_IDS_STRUCT.pack_into(self.buffer, self.offset + ASSET_IDS_OFFSET, asset_1_id, asset_2_id)
+        return bytes(self.buffer[self.offset:])
+
+    def get_logicsig(self, asset_a_id, asset_b_id):
+        return transaction.LogicSigAccount(self.get_program(asset_a_id, asset_b_id))
+
+    def get_pool_address(self, asset_a_id, asset_b_id):
+        key = get_pool_key(asset_a_id, asset_b_id)
+        address = self.addresses.get(key)
+        if address is None:
+            ASSET_IDS_STRUCT.pack_into(self.buffer, self.offset + ASSET_IDS_OFFSET, *key)
+            address = get_program_address(bytes(self.buffer))
+            self.addresses[key] = address
+        return address
+
+    def get_pool_addresses(self, pairs):
+        # Returns the pool addresses of the asset pairs in the same order.
+        addresses = self.addresses
+        buffer = self.buffer
+        pack_into = ASSET_IDS_STRUCT.pack_into
+        offset = self.offset + ASSET_IDS_OFFSET
+        result = []
+        for asset_a_id, asset_b_id in pairs:
+            key = (asset_a_id, asset_b_id) if asset_a_id > asset_b_id else (asset_b_id, asset_a_id)
+            address = addresses.get(key)
+            if address is None:
+                pack_into(buffer, offset, *key)
+                address = get_program_address(bytes(buffer))
+                addresses[key] = address
+            result.append(address)
+        return result
+
+    def clear(self):
+        self.addresses.clear()
@@ -0,0 +1,128 @@
+"""
+Bit-exact implementation of the swap router quote calculations.
+The functions have the same names and the same integer semantics as the contract functions.
+Pool states are plain integers, a hop is (input_supply, output_supply, total_fee_share) as returned by get_pool_state().
+"""
+from collections import namedtuple
+
+MAX_UINT64 = 2 ** 64 - 1
+FEE_DENOMINATOR = 10000
+
+FIXED_INPUT = "fixed-input"
+FIXED_OUTPUT = "fixed-output"
+
+# Pool local state of Tinyman AMM V2, asset_1_id > asset_2_id.
+PoolState = namedtuple("PoolState", ["asset_1_id", "asset_2_id", "asset_1_reserves", "asset_2_reserves", "total_fee_share"])
+
+# input_amount is the net amount which means the input amount sent minus the change amount, as in the swap event.
+# route_amounts are the input amount of each hop followed by the output amount of the route.
+Quote = namedtuple("Quote", ["input_amount", "output_amount", "change_amount", "route_amounts"])
+
+
+class SwapError(Exception):
+    """ The swap would fail on chain. """
+
+
+def check_uint64(value):
+    if value < 0 or value > MAX_UINT64:
+        raise SwapError("uint64 overflow or underflow: {}".format(value))
+    return value
+
+
+def get_pool_state(pool, input_asset_id, output_asset_id):
+    # Returns input supply, output supply and total fee share for the swap direction.
+    if input_asset_id == pool.asset_1_id and output_asset_id == pool.asset_2_id:
+        return pool.asset_1_reserves, pool.asset_2_reserves, pool.total_fee_share
+    if input_asset_id == pool.asset_2_id and output_asset_id == pool.asset_1_id:
+        return pool.asset_2_reserves, pool.asset_1_reserves, pool.total_fee_share
+    raise SwapError("pool doesn't match the hop assets: {} -> {}".format(input_asset_id, output_asset_id))
+
+
+def get_route_hops(pools, asset_ids):
+    # pools[i] swaps asset_ids[i] to asset_ids[i + 1].
+    if len(asset_ids) != len(pools) + 1:
+        raise ValueError("a route of n pools must have n + 1 assets")
+    return [get_pool_state(pool, asset_ids[i], asset_ids[i + 1]) for i, pool in enumerate(pools)]
+
+
+def calculate_fixed_input_swap(input_supply, output_supply, swap_amount):
+    # k = input_supply * output_supply, it is a 128 bit integer (b*) in the contract.
+    # -1 for Round Down
+    k = input_supply * output_supply
+    denominator = check_uint64(input_supply + swap_amount)
+    if not denominator:
+        raise SwapError("input supply and swap amount are 0")
+    return check_uint64(output_supply - k // denominator - 1)
+
+
+def calculate_fixed_input_fee_amount(input_amount, total_fee_share):
+    return check_uint64(input_amount * total_fee_share) // FEE_DENOMINATOR
+
+
+def calculate_fixed_output_swap(input_supply, output_supply, output_amount):
+    # +1 for Round Up
+    k = input_supply * output_supply
+    denominator = check_uint64(output_supply - output_amount)
+    if not denominator:
+        raise SwapError("output amount is equal to the output supply")
+    return check_uint64(check_uint64(check_uint64(k // denominator) + 1) - input_supply)
+
+
+def calculate_fixed_output_fee_amounts(swap_amount, total_fee_share):
+    input_amount = check_uint64(swap_amount * FEE_DENOMINATOR) // (FEE_DENOMINATOR - total_fee_share)
+    return input_amount - swap_amount
+
+
+def calculate_fixed_input_route_amounts(hops, input_amount):
+    # Returns the input amount of each hop followed by the output amount of the route.
+    amount = input_amount
+    route_amounts = [input_amount]
+    for input_supply, output_supply, total_fee_share in hops:
+        total_fee_amount = calculate_fixed_input_fee_amount(amount, total_fee_share)
+        amount = calculate_fixed_input_swap(input_supply, output_supply, amount - total_fee_amount)
+        route_amounts.append(amount)
+    return route_amounts
+
+
+def calculate_fixed_output_route_amounts(hops, output_amount):
+    # Returns the required input amount of each hop followed by the output amount of the route.
+    # The amounts are calculated starting from the last hop.
+    required_amount = output_amount
+    route_amounts = [output_amount]
+    for input_supply, output_supply, total_fee_share in reversed(hops):
+        swap_amount = calculate_fixed_output_swap(input_supply, output_supply, required_amount)
+        total_fee_amount = calculate_fixed_output_fee_amounts(swap_amount, total_fee_share)
+        required_amount = check_uint64(swap_amount + total_fee_amount)
+        route_amounts.append(required_amount)
+    route_amounts.reverse()
+    return route_amounts
+
+
+def quote_fixed_input(hops, input_amount, minimum_output_amount=1):
+    route_amounts = calculate_fixed_input_route_amounts(hops, input_amount)
+    # Minimum intermediary output amount is 1.
+    if not all(route_amounts[1:-1]):
+        raise SwapError("intermediary output amount is 0")
+    if route_amounts[-1] < minimum_output_amount:
+        raise SwapError("output amount is less than the minimum output amount")
+    return Quote(input_amount, route_amounts[-1], 0, route_amounts)
+
+
+def quote_fixed_output(hops, output_amount, input_amount=None):
+    # input_amount is the amount sent to the router, the rest of the required amount is the change.
+    route_amounts = calculate_fixed_output_route_amounts(hops, output_amount)
+    required_input_amount = route_amounts[0]
+    if input_amount is None:
+        input_amount = required_input_amount
+    if input_amount < required_input_amount:
+        raise SwapError("input amount is less than the required input amount: {}".format(required_input_amount))
+    return Quote(required_input_amount, output_amount, input_amount - required_input_amount, route_amounts)
+
+
+def quote(hops, mode, amount):
+    # amount is the input amount for fixed-input and the output amount for fixed-output, as in the quote method.
+    if mode == FIXED_INPUT:
+        return quote_fixed_input(hops, amount)
+    if mode == FIXED_OUTPUT:
+        return quote_fixed_output(hops, amount)
+    raise ValueError("unknown mode: {}".format(mode))
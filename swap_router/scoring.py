@@ -0,0 +1,85 @@
+"""
+Transaction fee aware route scoring.
+The direct routes are swapped with a single AMM app call and the routes with an intermediary asset are swapped with the router.
+The transaction fees are converted from Algo to the input asset using the cheapest route between the input asset and Algo.
+"""
+import heapq
+from collections import namedtuple
+
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT, SwapError, get_route_hops, quote_fixed_input, quote_fixed_output
+from swap_router.transactions import MIN_FEE, get_swap_app_call_fee
+
+ALGO_ASSET_ID = 0
+
+# Tinyman AMM V2 swap app call fee, the AMM issues the output transfer and the change transfer of fixed-output swaps with change.
+AMM_APP_CALL_FEE_COUNT = 2
+
+# fee_amount is the total transaction fee of the group in microAlgo, input_fee_amount is the same fee in the input asset.
+# input_fee_amount is None if there is no route between the input asset and Algo, the fee isn't included in the net amount then.
+# net_amount is the output amount of (input amount - input fee amount) for fixed-input and input amount + input fee amount for fixed-output.
+ScoredRoute = namedtuple("ScoredRoute", ["route", "quote", "fee_amount", "input_fee_amount", "net_amount"])
+
+
+def get_route_fee_amount(mode, hop_count, has_change=False, opt_in_count=0, min_fee=MIN_FEE):
+    # Returns the total transaction fee of the swap group, the input transaction and the app call.
+    # has_change applies to the direct swaps and the router swaps in the same way, the exact quoted input amount doesn't have change.
+    if hop_count == 1:
+        if mode == FIXED_INPUT:
+            return min_fee * (1 + AMM_APP_CALL_FEE_COUNT)
+        if mode == FIXED_OUTPUT:
+            return min_fee * (1 + AMM_APP_CALL_FEE_COUNT + int(has_change))
+        raise ValueError("unknown mode: {}".format(mode))
+    return min_fee + get_swap_app_call_fee(mode, hop_count, has_change=has_change, opt_in_count=opt_in_count, min_fee=min_fee)
+
+
+def get_input_fee_amount(graph, input_asset_id, fee_amount):
+    # Returns the input asset amount which is required to buy fee_amount Algo, None if there isn't any route.
+    if input_asset_id == ALGO_ASSET_ID:
+        return fee_amount
+    best_routes = graph.get_best_routes(input_asset_id, ALGO_ASSET_ID, fee_amount, mode=FIXED_OUTPUT)
+    if not best_routes:
+        return None
+    return best_routes[0].quote.input_amount
+
+
+def score_routes(graph, input_asset_id, output_asset_id, amount, mode=FIXED_INPUT, has_change=False, opt_in_count=0, min_fee=MIN_FEE):
+    # Returns the ScoredRoutes of the pair, the routes that would fail are skipped.
+    # has_change is True if the fixed-output swaps send more than the quoted input amount, e.g. with a slippage tolerance.
+    # opt_in_count is the number of assets that the router must opt in, it only applies to the router routes.
+    scored_routes = []
+    input_fee_amounts = {}
+    for route in graph.get_routes(input_asset_id, output_asset_id):
+        hop_count = len(route.pools)
+        fee_amount = get_route_fee_amount(mode, hop_count, has_change=has_change, opt_in_count=opt_in_count if hop_count > 1 else 0, min_fee=min_fee)
+        if fee_amount not in input_fee_amounts:
+            input_fee_amounts[fee_amount] = get_input_fee_amount(graph, input_asset_id, fee_amount)
+        input_fee_amount = input_fee_amounts[fee_amount]
+
+        hops = get_route_hops(route.pools, route.asset_ids)
+        try:
+            if mode == FIXED_INPUT:
+                route_quote = quote_fixed_input(hops, amount)
+                if input_fee_amount is None:
+                    net_amount = route_quote.output_amount
+                elif input_fee_amount < amount:
+                    net_amount = quote_fixed_input(hops, amount - input_fee_amount).output_amount
+                else:
+                    net_amount = 0
+            elif mode == FIXED_OUTPUT:
+                route_quote = quote_fixed_output(hops, amount)
+                net_amount = route_quote.input_amount + (input_fee_amount or 0)
+            else:
+                raise ValueError("unknown mode: {}".format(mode))
+        except SwapError:
+            continue
+        scored_routes.append(ScoredRoute(route, route_quote, fee_amount, input_fee_amount, net_amount))
+    return scored_routes
+
+
+def get_best_scored_routes(graph, input_asset_id, output_asset_id, amount, mode=FIXED_INPUT, has_change=False, opt_in_count=0, min_fee=MIN_FEE, k=1):
+    # Returns the top k routes net of the transaction fees.
+    # The highest net output amount for fixed-input and the lowest net input amount for fixed-output.
+    scored_routes = score_routes(graph, input_asset_id, output_asset_id, amount, mode=mode, has_change=has_change, opt_in_count=opt_in_count, min_fee=min_fee)
+    if mode == FIXED_INPUT:
+        return heapq.nlargest(k, scored_routes, key=lambda r: r.net_amount)
+    return heapq.nsmallest(k, scored_routes, key=lambda r: r.net_amount)
@@ -0,0 +1,53 @@
+"""
+Slippage tolerance for the swap arguments.
+The tolerance is in basis points, the minimum output amount is rounded down and the input amount of fixed-output swaps is rounded up.
+"""
+from collections import namedtuple
+
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT, check_uint64, quote_fixed_input, quote_fixed_output
+
+SLIPPAGE_DENOMINATOR = 10000
+
+# input_amount and amount are the arguments of prepare_swap_transactions.
+# input_amount is the amount sent to the router, amount is the minimum output amount for fixed-input and the output amount for fixed-output.
+# change_amount is the expected change with the current pool states, quote is the expected quote.
+SwapAmounts = namedtuple("SwapAmounts", ["input_amount", "amount", "change_amount", "quote"])
+
+
+def check_slippage(slippage):
+    if not 0 <= slippage < SLIPPAGE_DENOMINATOR:
+        raise ValueError("slippage must be in [0, {}) basis points: {}".format(SLIPPAGE_DENOMINATOR, slippage))
+    return slippage
+
+
+def get_minimum_output_amount(output_amount, slippage):
+    # Minimum output amount is 1.
+    check_slippage(slippage)
+    return max(output_amount * (SLIPPAGE_DENOMINATOR - slippage) // SLIPPAGE_DENOMINATOR, 1)
+
+
+def get_maximum_input_amount(input_amount, slippage):
+    # -(-a // b) is ceil(a / b).
+    check_slippage(slippage)
+    return check_uint64(-(-input_amount * (SLIPPAGE_DENOMINATOR + slippage) // SLIPPAGE_DENOMINATOR))
+
+
+def get_fixed_input_swap_amounts(hops, input_amount, slippage):
+    route_quote = quote_fixed_input(hops, input_amount)
+    return SwapAmounts(input_amount, get_minimum_output_amount(route_quote.output_amount, slippage), 0, route_quote)
+
+
+def get_fixed_output_swap_amounts(hops, output_amount, slippage):
+    required_input_amount = quote_fixed_output(hops, output_amount).input_amount
+    input_amount = get_maximum_input_amount(required_input_amount, slippage)
+    route_quote = quote_fixed_output(hops, output_amount, input_amount=input_amount)
+    return SwapAmounts(input_amount, output_amount, route_quote.change_amount, route_quote)
+
+
+def get_swap_amounts(hops, mode, amount, slippage):
+    # amount is the input amount for fixed-input and the output amount for fixed-output.
+    if mode == FIXED_INPUT:
+        return get_fixed_input_swap_amounts(hops, amount, slippage)
+    if mode == FIXED_OUTPUT:
+        return get_fixed_output_swap_amounts(hops, amount, slippage)
+    raise ValueError("unknown mode: {}".format(mode))
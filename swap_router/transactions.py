@@ -0,0 +1,124 @@
+"""
+Transaction group builder for the swap router.
+The app call fee covers the inner transactions that the router issues for the mode, it is calculated exactly.
+"""
+import copy
+
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT
+
+FIXED_OUTPUT_TOLERANT = "fixed-output-tolerant"
+FIXED_INPUT_SPLIT = "fixed-input-split"
+ARBITRAGE = "arbitrage"
+
+MIN_FEE = 1000
+# Minimum balance increase of an asset opt-in
+ASSET_MIN_BALANCE = 100_000
+
+# Each hop issues the input transfer to the pool and the AMM app call, the AMM app call issues the output transfer.
+HOP_INNER_TRANSACTION_COUNT = 3
+
+
+def get_swap_inner_transaction_count(mode, hop_count, has_change=False, opt_in_count=0):
+    # hop_count is the total number of hops of the routes.
+    # The router calculates the exact input amount of each hop in fixed-output modes, the AMM swaps don't return change.
+    # Algo and ASA transfers are both a single inner transaction.
+    if mode not in (FIXED_INPUT, FIXED_OUTPUT, FIXED_OUTPUT_TOLERANT, FIXED_INPUT_SPLIT, ARBITRAGE):
+        raise ValueError("unknown mode: {}".format(mode))
+
+    count = opt_in_count + hop_count * HOP_INNER_TRANSACTION_COUNT
+    # Output transfer
+    count += 1
+    # Change transfer
+    if mode in (FIXED_OUTPUT, FIXED_OUTPUT_TOLERANT) and has_change:
+        count += 1
+    return count
+
+
+def get_swap_app_call_fee(mode, hop_count, has_change=False, opt_in_count=0, min_fee=MIN_FEE):
+    return min_fee * (1 + get_swap_inner_transaction_count(mode, hop_count, has_change=has_change, opt_in_count=opt_in_count))
+
+
+def get_batch_swap_app_call_fee(instructions, opt_in_count=0, min_fee=MIN_FEE):
+    # instructions is a list of (mode, hop_count, has_change).
+    count = opt_in_count
+    for mode, hop_count, has_change in instructions:
+        count += get_swap_inner_transaction_count(mode, hop_count, has_change=has_change)
+    return min_fee * (1 + count)
+
+
+def get_opt_in_count(route_asset_ids, opted_in_asset_ids):
+    # The router opts in to the route assets which it is not opted in yet, Algo doesn't require an opt-in.
+    return len({asset_id for asset_id in route_asset_ids if asset_id and asset_id not in opted_in_asset_ids})
+
+
+def get_min_fee(suggested_params):
+    return getattr(suggested_params, "min_fee", None) or MIN_FEE
+
+
+def prepare_swap_transactions(
+    sender, suggested_params, router_app_id, amm_app_id, route_asset_ids, pool_addresses,
+    mode, input_amount, amount, has_change=None, app_args=None, hop_count=None, opt_in_count=0
+):
+    # amount is the minimum output amount for fixed-input modes and the output amount for fixed-output modes.
+    # has_change is whether the fee covers the change transfer of fixed-output modes, None means it does.
+    # The change depends on the pool states when the group is evaluated, a quote without change doesn't mean that the swap won't have change.
+    # app_args and hop_count can be given for the modes with additional arguments (fixed-input-split, arbitrage).
+    # opt_in_count is the number of assets that the router must opt in, the minimum balance increase is transferred before the input transaction.
+    min_fee = get_min_fee(suggested_params)
+    sp = copy.copy(suggested_params)
+    sp.flat_fee = True
+    sp.fee = min_fee
+
+    if app_args is None:
+        app_args = ["swap", mode, amount]
+    if hop_count is None:
+        hop_count = len(pool_addresses)
+    if has_change is None:
+        has_change = mode in (FIXED_OUTPUT, FIXED_OUTPUT_TOLERANT)
+
+    input_asset_id = route_asset_ids[0]
+    router_address = get_application_address(router_app_id)
+    if input_asset_id:
+        input_txn = transaction.AssetTransferTxn(
+            sender=sender,
+            sp=sp,
+            receiver=router_address,
+            amt=input_amount,
+            index=input_asset_id,
+        )
+    else:
+        input_txn = transaction.PaymentTxn(
+            sender=sender,
+            sp=sp,
+            receiver=router_address,
+            amt=input_amount,
+        )
+
+    app_call_sp = copy.copy(sp)
+    app_call_sp.fee = get_swap_app_call_fee(mode, hop_count, has_change=has_change, opt_in_count=opt_in_count, min_fee=min_fee)
+    app_call_txn = transaction.ApplicationNoOpTxn(
+        sender=sender,
+        sp=app_call_sp,
+        index=router_app_id,
+        app_args=app_args,
+        accounts=pool_addresses,
+        foreign_apps=[amm_app_id],
+        foreign_assets=route_asset_ids,
+    )
+    txn_group = [input_txn, app_call_txn]
+    if opt_in_count:
+        txn_group.insert(0, transaction.PaymentTxn(
+            sender=sender,
+            sp=sp,
+            receiver=router_address,
+            amt=opt_in_count * ASSET_MIN_BALANCE,
+        ))
+    return transaction.assign_group_id(txn_group)
+
+
+def sign_transactions(txn_groups, private_key):
+    # Signs the transactions of the groups with the same key.
+    return [[txn.sign(private_key) for txn in txn_group] for txn_group in txn_groups]
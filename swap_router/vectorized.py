@@ -0,0 +1,150 @@
+"""
+NumPy implementation of the swap router quote calculations for arrays of amounts and pool states.
+The results are bit-exact with swap_router.quote, the 128 bit products (b*) and divisions (b/) of the contract
+are calculated with two uint64 words. Instead of raising SwapError, the functions return a "valid" mask.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from swap_router.quote import FEE_DENOMINATOR
+
+MAX_UINT64 = np.uint64(2 ** 64 - 1)
+MASK_32 = np.uint64(0xFFFFFFFF)
+ZERO = np.uint64(0)
+ONE = np.uint64(1)
+SHIFT_32 = np.uint64(32)
+SHIFT_63 = np.uint64(63)
+
+# Each field is an array, route_amounts has a row for each hop amount.
+BatchQuote = namedtuple("BatchQuote", ["input_amounts", "output_amounts", "change_amounts", "route_amounts", "valid"])
+
+
+def as_uint64(values):
+    return np.asarray(values, dtype=np.uint64)
+
+
+def multiply_128(a, b):
+    # Returns the high and low words of a * b.
+    a_low, a_high = a & MASK_32, a >> SHIFT_32
+    b_low, b_high = b & MASK_32, b >> SHIFT_32
+    low_low = a_low * b_low
+    high_low = a_high * b_low
+    low_high = a_low * b_high
+    # cross is less than 2 ** 64, it can't overflow.
+    cross = (low_low >> SHIFT_32) + (high_low & MASK_32) + low_high
+    high = a_high * b_high + (high_low >> SHIFT_32) + (cross >> SHIFT_32)
+    low = (cross << SHIFT_32) | (low_low & MASK_32)
+    return high, low
+
+
+def divide_128(high, low, divisor):
+    # Returns floor((high * 2 ** 64 + low) / divisor) and the valid mask.
+    # The quotient is invalid if the divisor is 0 or the quotient doesn't fit in uint64 (btoi fails in the contract).
+    valid = (divisor != ZERO) & (high < divisor)
+    divisor = np.where(valid, divisor, ONE)
+    if not high.any():
+        return np.where(valid, low // divisor, ZERO), valid
+
+    # Long division, the remainder is always less than the divisor.
+    remainder = np.where(valid, high, ZERO)
+    quotient = np.zeros_like(low)
+    for i in range(63, -1, -1):
+        carry = (remainder >> SHIFT_63) != ZERO
+        remainder = (remainder << ONE) | ((low >> np.uint64(i)) & ONE)
+        take = carry | (remainder >= divisor)
+        remainder = np.where(take, remainder - divisor, remainder)
+        quotient = (quotient << ONE) | take.astype(np.uint64)
+    return np.where(valid, quotient, ZERO), valid
+
+
+def calculate_fixed_input_swap(input_supply, output_supply, swap_amount):
+    denominator = input_supply + swap_amount
+    valid = denominator >= input_supply
+    quotient, is_divided = divide_128(*multiply_128(input_supply, output_supply), denominator)
+    # -1 for Round Down
+    valid &= is_divided & (quotient < output_supply)
+    return np.where(valid, output_supply - quotient - ONE, ZERO), valid
+
+
+def calculate_fixed_input_fee_amount(input_amount, total_fee_share):
+    high, low = multiply_128(input_amount, total_fee_share)
+    valid = high == ZERO
+    return np.where(valid, low // np.uint64(FEE_DENOMINATOR), ZERO), valid
+
+
+def calculate_fixed_output_swap(input_supply, output_supply, output_amount):
+    valid = output_amount < output_supply
+    quotient, is_divided = divide_128(*multiply_128(input_supply, output_supply), np.where(valid, output_supply - output_amount, ZERO))
+    # +1 for Round Up
+    valid &= is_divided & (quotient < MAX_UINT64) & (quotient + ONE >= input_supply)
+    return np.where(valid, quotient + ONE - input_supply, ZERO), valid
+
+
+def calculate_fixed_output_fee_amounts(swap_amount, total_fee_share):
+    high, low = multiply_128(swap_amount, np.uint64(FEE_DENOMINATOR))
+    denominator = np.uint64(FEE_DENOMINATOR) - total_fee_share
+    valid = (high == ZERO) & (total_fee_share < np.uint64(FEE_DENOMINATOR))
+    input_amount = low // np.where(valid, denominator, ONE)
+    return np.where(valid, input_amount - swap_amount, ZERO), valid
+
+
+def get_route_arrays(hops, amounts):
+    # Broadcasts the amounts and the pool states of the hops to the same shape.
+    arrays = np.broadcast_arrays(as_uint64(amounts), *[as_uint64(value) for hop in hops for value in hop])
+    amounts = np.array(arrays[0])
+    hops = [tuple(arrays[1 + i * 3:4 + i * 3]) for i in range(len(hops))]
+    return hops, amounts
+
+
+def calculate_fixed_input_route_amounts(hops, input_amounts):
+    # Returns the input amount of each hop followed by the output amount of the route, and the valid mask.
+    hops, amount = get_route_arrays(hops, input_amounts)
+    valid = np.ones(amount.shape, dtype=bool)
+    route_amounts = [amount]
+    with np.errstate(over="ignore"):
+        for input_supply, output_supply, total_fee_share in hops:
+            total_fee_amount, is_valid = calculate_fixed_input_fee_amount(amount, total_fee_share)
+            valid &= is_valid
+            amount, is_valid = calculate_fixed_input_swap(input_supply, output_supply, amount - total_fee_amount)
+            valid &= is_valid
+            route_amounts.append(amount)
+    return np.stack(route_amounts), valid
+
+
+def calculate_fixed_output_route_amounts(hops, output_amounts):
+    # Returns the required input amount of each hop followed by the output amount of the route, and the valid mask.
+    hops, required_amount = get_route_arrays(hops, output_amounts)
+    valid = np.ones(required_amount.shape, dtype=bool)
+    route_amounts = [required_amount]
+    with np.errstate(over="ignore"):
+        for input_supply, output_supply, total_fee_share in reversed(hops):
+            swap_amount, is_valid = calculate_fixed_output_swap(input_supply, output_supply, required_amount)
+            valid &= is_valid
+            total_fee_amount, is_valid = calculate_fixed_output_fee_amounts(swap_amount, total_fee_share)
+            valid &= is_valid
+            required_amount = swap_amount + total_fee_amount
+            valid &= required_amount >= swap_amount
+            route_amounts.append(required_amount)
+    return np.stack(route_amounts[::-1]), valid
+
+
+def quote_fixed_input(hops, input_amounts, minimum_output_amounts=1):
+    route_amounts, valid = calculate_fixed_input_route_amounts(hops, input_amounts)
+    # Minimum intermediary output amount is 1.
+    valid &= np.all(route_amounts[1:-1] != ZERO, axis=0)
+    valid &= route_amounts[-1] >= as_uint64(minimum_output_amounts)
+    return BatchQuote(route_amounts[0], route_amounts[-1], np.zeros_like(route_amounts[0]), route_amounts, valid)
+
+
+def quote_fixed_output(hops, output_amounts, input_amounts=None):
+    # input_amounts are the amounts sent to the router, the rest of the required amounts are the change.
+    route_amounts, valid = calculate_fixed_output_route_amounts(hops, output_amounts)
+    required_input_amounts = route_amounts[0]
+    if input_amounts is None:
+        change_amounts = np.zeros_like(required_input_amounts)
+    else:
+        input_amounts = as_uint64(input_amounts)
+        valid &= input_amounts >= required_input_amounts
+        change_amounts = np.where(valid, input_amounts - required_input_amounts, ZERO)
+    return BatchQuote(required_input_amounts, route_amounts[-1], change_amounts, route_amounts, valid)
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from swap_router.cache import PoolStateCache, get_pool_state_from_local_state
+from swap_router.quote import PoolState
+
+POOL_1 = PoolState(asset_1_id=10, asset_2_id=7, asset_1_reserves=1_000_000, asset_2_reserves=2_000_000, total_fee_share=30)
+POOL_2 = PoolState(asset_1_id=7, asset_2_id=5, asset_1_reserves=1_000_000, asset_2_reserves=5_000_000, total_fee_share=30)
+POOL_3 = PoolState(asset_1_id=5, asset_2_id=3, asset_1_reserves=1_000_000, asset_2_reserves=3_000_000, total_fee_share=30)
+
+
+class PoolStateCacheTestCase(TestCase):
+
+    def test_freshness(self):
+        cache = PoolStateCache(max_age=5)
+        cache.set("POOL_1", POOL_1, round=100)
+
+        self.assertEqual(cache.get("POOL_1", current_round=105), POOL_1)
+        self.assertIsNone(cache.get("POOL_1", current_round=106))
+        self.assertEqual(cache.get("POOL_1", current_round=106, max_age=10), POOL_1)
+        self.assertTrue(cache.is_fresh("POOL_1", current_round=105))
+        self.assertEqual(cache.get_stale_pool_addresses(current_round=106), ["POOL_1"])
+
+        # Older rounds are ignored.
+        self.assertFalse(cache.set("POOL_1", POOL_2, round=99))
+        self.assertEqual(cache.get_entry("POOL_1").pool, POOL_1)
+        self.assertTrue(cache.set("POOL_1", POOL_2, round=101))
+        self.assertEqual(cache.get_entry("POOL_1").round, 101)
+
+    def test_lru_eviction(self):
+        cache = PoolStateCache(max_size=2)
+        cache.set("POOL_1", POOL_1, round=100)
+        cache.set("POOL_2", POOL_2, round=100)
+        # POOL_1 is used recently, POOL_2 is evicted.
+        cache.get("POOL_1")
+        cache.set("POOL_3", POOL_3, round=100)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn("POOL_1", cache)
+        self.assertNotIn("POOL_2", cache)
+        self.assertIn("POOL_3", cache)
+
+    def test_get_pool_state_from_local_state(self):
+        local_state = {
+            b'asset_1_id': 10,
+            b'asset_2_id': 7,
+            b'asset_1_reserves': 1_000_000,
+            b'asset_2_reserves': 2_000_000,
+            b'total_fee_share': 30,
+            b'issued_pool_tokens': 1_414_213,
+        }
+        self.assertEqual(get_pool_state_from_local_state(local_state), POOL_1)
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from algosdk.account import generate_account
+from algosdk.encoding import decode_address
+
+from swap_router.cache import PoolStateCache
+from swap_router.deltas import PoolStateUpdater
+from swap_router.quote import PoolState
+
+AMM_APPLICATION_ID = 1
+SWAP_ROUTER_APP_ID = 20
+
+
+def get_amm_swap_txn(sender, pool_address, asset_1_reserves, asset_2_reserves):
+    # The inner AMM app call of a router swap with the local state delta of the pool.
+    return {
+        b'txn': {
+            b'type': b'appl',
+            b'apid': AMM_APPLICATION_ID,
+            b'snd': decode_address(sender),
+            b'apat': [decode_address(pool_address)],
+        },
+        b'dt': {
+            b'ld': {
+                1: {
+                    b'asset_1_reserves': {b'at': 2, b'ui': asset_1_reserves},
+                    b'asset_2_reserves': {b'at': 2, b'ui': asset_2_reserves},
+                }
+            }
+        }
+    }
+
+
+class PoolStateUpdaterTestCase(TestCase):
+
+    def test_apply_block(self):
+        _, router_address = generate_account()
+        _, pool_1_address = generate_account()
+        _, pool_2_address = generate_account()
+
+        cache = PoolStateCache()
+        cache.set(pool_1_address, PoolState(10, 7, 1_000_000, 2_000_000, 30), round=100)
+        updater = PoolStateUpdater(cache, AMM_APPLICATION_ID)
+
+        block = {
+            b'rnd': 101,
+            b'txns': [
+                {
+                    b'txn': {b'type': b'appl', b'apid': SWAP_ROUTER_APP_ID, b'snd': decode_address(router_address)},
+                    b'dt': {
+                        b'itx': [
+                            get_amm_swap_txn(router_address, pool_1_address, 1_001_000, 1_998_008),
+                            get_amm_swap_txn(router_address, pool_2_address, 1_001_992, 4_990_085),
+                        ]
+                    }
+                }
+            ]
+        }
+        changed_pool_addresses = updater.apply_block(block)
+
+        self.assertEqual(changed_pool_addresses, {pool_1_address, pool_2_address})
+        self.assertEqual(cache.get_entry(pool_1_address), (PoolState(10, 7, 1_001_000, 1_998_008, 30), 101))
+        # The pools which are not cached are reported but not added.
+        self.assertNotIn(pool_2_address, cache)
+        self.assertEqual(updater.pop_changed_pools(101), changed_pool_addresses)
+
+    def test_apply_algod_block(self):
+        _, router_address = generate_account()
+        _, pool_address = generate_account()
+
+        cache = PoolStateCache()
+        cache.set(pool_address, PoolState(10, 7, 1_000_000, 2_000_000, 30), round=100)
+        updater = PoolStateUpdater(cache, AMM_APPLICATION_ID, max_rounds=2)
+
+        for round in [101, 102, 103]:
+            # The algod response wraps the block with the certificate.
+            response = {
+                b'block': {
+                    b'rnd': round,
+                    b'txns': [get_amm_swap_txn(router_address, pool_address, 1_000_000 + round, 2_000_000 - round)],
+                },
+                b'cert': {},
+            }
+            self.assertEqual(updater.apply_block(response), {pool_address})
+
+        self.assertEqual(cache.get_entry(pool_address), (PoolState(10, 7, 1_000_103, 1_999_897, 30), 103))
+        # The rounds which are not popped are dropped.
+        self.assertEqual(list(updater.changed_pools), [102, 103])
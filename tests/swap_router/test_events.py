@@ -0,0 +1,54 @@
+from array import array
+from unittest import TestCase
+
+from algosdk.abi import Method
+
+from swap_router.events import decode_logs, swap_event, swap_hop_event
+from tests.utils import itob
+
+
+def get_swap_log(input_asset_id, output_asset_id, input_amount, output_amount):
+    return swap_event.selector + itob(input_asset_id) + itob(output_asset_id) + itob(input_amount) + itob(output_amount)
+
+
+class EventDecoderTestCase(TestCase):
+
+    def setUp(self):
+        self.logs = [
+            swap_hop_event.selector + bytes([1]) + itob(10) + itob(7) + itob(1000) + itob(1992),
+            get_swap_log(10, 7, 1000, 1992),
+            # ARC-4 return value
+            Method.from_signature("swap_fixed_input(txn,uint64)(uint64,uint64,uint64)").get_selector() + itob(1000) + itob(1992) + itob(0),
+            get_swap_log(7, 5, 2 ** 64 - 1, 9915),
+        ]
+
+    def test_decode(self):
+        self.assertEqual(swap_event.decode(self.logs[1]), (10, 7, 1000, 1992))
+        self.assertIsNone(swap_event.decode(self.logs[0]))
+        self.assertEqual(swap_event.decode_many(self.logs), [(10, 7, 1000, 1992), (7, 5, 2 ** 64 - 1, 9915)])
+        self.assertEqual(swap_hop_event.decode_many(self.logs), [(1, 10, 7, 1000, 1992)])
+
+    def test_decode_columns(self):
+        columns = swap_event.decode_columns(self.logs)
+        self.assertEqual(list(columns.input_asset_id), [10, 7])
+        self.assertEqual(list(columns.input_amount), [1000, 2 ** 64 - 1])
+        self.assertEqual(list(columns.output_amount), [1992, 9915])
+
+        columns = swap_hop_event.decode_columns(self.logs)
+        self.assertEqual(columns.pool_index, array("B", [1]))
+        self.assertEqual(columns.output_amount, array("Q", [1992]))
+        self.assertEqual(columns.input_asset_id.typecode, swap_event.decode_columns(self.logs).input_asset_id.typecode)
+
+        columns = swap_hop_event.decode_columns([])
+        self.assertEqual(columns.pool_index, array("B"))
+        self.assertEqual(columns.output_amount, array("Q"))
+
+    def test_decode_logs(self):
+        self.assertEqual(
+            list(decode_logs(self.logs)),
+            [
+                ("swap_hop", (1, 10, 7, 1000, 1992)),
+                ("swap", (10, 7, 1000, 1992)),
+                ("swap", (7, 5, 2 ** 64 - 1, 9915)),
+            ]
+        )
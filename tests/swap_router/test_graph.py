@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from swap_router.graph import PoolGraph
+from swap_router.quote import FIXED_OUTPUT, PoolState
+
+TOTAL_FEE_SHARE = 30
+
+
+def create_pool(input_asset_id, output_asset_id, input_reserves, output_reserves):
+    asset_1_id, asset_2_id = sorted([input_asset_id, output_asset_id], reverse=True)
+    return PoolState(
+        asset_1_id=asset_1_id,
+        asset_2_id=asset_2_id,
+        asset_1_reserves=input_reserves if asset_1_id == input_asset_id else output_reserves,
+        asset_2_reserves=output_reserves if asset_1_id == input_asset_id else input_reserves,
+        total_fee_share=TOTAL_FEE_SHARE,
+    )
+
+
+class PoolGraphTestCase(TestCase):
+
+    def setUp(self):
+        self.asset_a_id = 10
+        self.asset_b_id = 7
+        self.asset_c_id = 5
+        self.asset_d_id = 3
+
+        # Asset A -> Asset C: 1000 -> 9960 (direct), 1000 -> 9915 (Asset B)
+        self.graph = PoolGraph([
+            create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000),
+            create_pool(self.asset_c_id, self.asset_d_id, 1_000_000, 3_000_000),
+        ])
+
+    def test_get_pool(self):
+        self.assertEqual(self.graph.get_pool(self.asset_a_id, self.asset_b_id), self.graph.get_pool(self.asset_b_id, self.asset_a_id))
+        self.assertIsNone(self.graph.get_pool(self.asset_a_id, self.asset_d_id))
+
+    def test_get_routes(self):
+        routes = self.graph.get_routes(self.asset_a_id, self.asset_c_id)
+        self.assertEqual(
+            sorted(route.asset_ids for route in routes),
+            [(self.asset_a_id, self.asset_c_id), (self.asset_a_id, self.asset_b_id, self.asset_c_id)]
+        )
+        routes = self.graph.get_routes(self.asset_a_id, self.asset_d_id)
+        self.assertEqual([route.asset_ids for route in routes], [(self.asset_a_id, self.asset_c_id, self.asset_d_id)])
+
+    def test_get_best_routes(self):
+        best_routes = self.graph.get_best_routes(self.asset_a_id, self.asset_c_id, 1000, k=2)
+        self.assertEqual([r.route.asset_ids for r in best_routes], [(self.asset_a_id, self.asset_c_id), (self.asset_a_id, self.asset_b_id, self.asset_c_id)])
+        self.assertEqual([r.quote.output_amount for r in best_routes], [9960, 9915])
+
+        best_routes = self.graph.get_best_routes(self.asset_a_id, self.asset_c_id, 9000, mode=FIXED_OUTPUT)
+        self.assertEqual(best_routes[0].route.asset_ids, (self.asset_a_id, self.asset_c_id))
+        self.assertEqual(best_routes[0].quote.input_amount, 903)
+
+    def test_remove_pool(self):
+        self.graph.remove_pool(self.asset_c_id, self.asset_a_id)
+        best_routes = self.graph.get_best_routes(self.asset_a_id, self.asset_c_id, 1000, k=2)
+        self.assertEqual([r.route.asset_ids for r in best_routes], [(self.asset_a_id, self.asset_b_id, self.asset_c_id)])
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from algosdk.account import generate_account
+
+from swap_router.index import PoolIndex, PoolIndexEntry, PoolIndexError
+from swap_router.pools import PoolAddressDeriver
+
+AMM_APPLICATION_ID = 1
+
+
+class PoolIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.deriver = PoolAddressDeriver(AMM_APPLICATION_ID)
+        self.index = PoolIndex(AMM_APPLICATION_ID)
+        self.index.add(7, 10, pool_token_asset_id=100)
+        self.index.add_local_state(self.deriver.get_pool_address(0, 10), {b"asset_1_id": 10, b"asset_2_id": 0, b"pool_token_asset_id": 101})
+
+    def test_get(self):
+        self.assertEqual(self.index.get(10, 7), PoolIndexEntry(self.deriver.get_pool_address(10, 7), 100))
+        self.assertEqual(self.index.get(0, 10).pool_token_asset_id, 101)
+        self.assertTrue(self.index.has_pool(10, 0))
+        self.assertIn((7, 10), self.index)
+        self.assertIsNone(self.index.get(7, 5))
+
+    def test_add_local_state(self):
+        # The account is not the pool of the pair.
+        _, address = generate_account()
+        self.assertFalse(self.index.add_local_state(address, {"asset_1_id": 7, "asset_2_id": 5, "pool_token_asset_id": 102}))
+        # The pool is not bootstrapped.
+        self.assertFalse(self.index.add_local_state(self.deriver.get_pool_address(7, 5), {"asset_1_id": 7, "asset_2_id": 5}))
+        self.assertFalse(self.index.has_pool(7, 5))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pools.index")
+            self.index.save(path)
+            index = PoolIndex.load(path, app_id=AMM_APPLICATION_ID)
+            self.assertEqual(index.entries, self.index.entries)
+
+            with self.assertRaises(PoolIndexError):
+                PoolIndex.load(path, app_id=AMM_APPLICATION_ID + 1)
+
+        with self.assertRaises(PoolIndexError):
+            PoolIndex.from_bytes(self.index.to_bytes()[:-1])
@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from algosdk.future import transaction
+
+from swap_router.pools import POOL_LOGICSIG_TEMPLATE, PoolAddressDeriver, get_pool_program
+
+AMM_APPLICATION_ID = 1
+
+
+class PoolAddressDeriverTestCase(TestCase):
+
+    def setUp(self):
+        self.deriver = PoolAddressDeriver(AMM_APPLICATION_ID)
+
+    def test_get_pool_address(self):
+        address = transaction.LogicSigAccount(get_pool_program(AMM_APPLICATION_ID, 10, 7)).address()
+        self.assertEqual(self.deriver.get_pool_address(10, 7), address)
+        self.assertEqual(self.deriver.get_pool_address(7, 10), address)
+        self.assertEqual(self.deriver.get_logicsig(7, 10).address(), address)
+        self.assertNotEqual(PoolAddressDeriver(AMM_APPLICATION_ID + 1).get_pool_address(10, 7), address)
+
+    def test_get_pool_addresses(self):
+        pairs = [(10, 7), (7, 5), (0, 10), (10, 7)]
+        addresses = self.deriver.get_pool_addresses(pairs)
+        self.assertEqual(
+            addresses,
+            [transaction.LogicSigAccount(get_pool_program(AMM_APPLICATION_ID, max(pair), min(pair))).address() for pair in pairs]
+        )
+        self.assertEqual(len(self.deriver.addresses), 3)
+
+    def test_invalid_template(self):
+        with self.assertRaises(ValueError):
+            PoolAddressDeriver(AMM_APPLICATION_ID, template=POOL_LOGICSIG_TEMPLATE[:-1] + b'\x00')
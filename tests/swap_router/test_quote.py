@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from swap_router.quote import (
+    FIXED_INPUT, FIXED_OUTPUT, PoolState, SwapError, calculate_fixed_input_route_amounts,
+    calculate_fixed_output_route_amounts, get_route_hops, quote, quote_fixed_input, quote_fixed_output
+)
+
+TOTAL_FEE_SHARE = 30
+
+# The same pools with the swap router tests.
+# Pool-1: 1_000_000 - 2_000_000
+# Pool-2: 1_000_000 - 5_000_000
+# Pool-3: 1_000_000 - 3_000_000
+THREE_HOP_ROUTE = [
+    (1_000_000, 2_000_000, TOTAL_FEE_SHARE),
+    (1_000_000, 5_000_000, TOTAL_FEE_SHARE),
+    (1_000_000, 3_000_000, TOTAL_FEE_SHARE),
+]
+
+
+class QuoteTestCase(TestCase):
+
+    def test_fixed_input_route_amounts(self):
+        self.assertEqual(calculate_fixed_input_route_amounts(THREE_HOP_ROUTE, 1000), [1000, 1992, 9915, 29367])
+
+    def test_fixed_output_route_amounts(self):
+        self.assertEqual(calculate_fixed_output_route_amounts(THREE_HOP_ROUTE, 29367), [1000, 1992, 9915, 29367])
+        self.assertEqual(calculate_fixed_output_route_amounts(THREE_HOP_ROUTE, 29000), [987, 1968, 9791, 29000])
+
+    def test_quote(self):
+        self.assertEqual(quote(THREE_HOP_ROUTE, FIXED_INPUT, 1000)[:3], (1000, 29367, 0))
+        self.assertEqual(quote(THREE_HOP_ROUTE, FIXED_OUTPUT, 29000)[:3], (987, 29000, 0))
+
+    def test_fixed_input_minimum_output(self):
+        self.assertEqual(quote_fixed_input(THREE_HOP_ROUTE, 1000, minimum_output_amount=29367).output_amount, 29367)
+        with self.assertRaises(SwapError):
+            quote_fixed_input(THREE_HOP_ROUTE, 1000, minimum_output_amount=29368)
+
+    def test_fixed_output_change(self):
+        hops = [(1_000_000, 10_000_000, TOTAL_FEE_SHARE)]
+        result = quote_fixed_output(hops, 9000, input_amount=1000)
+        self.assertEqual(result.input_amount, 903)
+        self.assertEqual(result.change_amount, 97)
+
+        with self.assertRaises(SwapError):
+            quote_fixed_output(hops, 9000, input_amount=902)
+
+    def test_route_hops(self):
+        # asset_1_id is greater than asset_2_id
+        pools = [
+            PoolState(asset_1_id=10, asset_2_id=7, asset_1_reserves=1_000_000, asset_2_reserves=2_000_000, total_fee_share=TOTAL_FEE_SHARE),
+            PoolState(asset_1_id=7, asset_2_id=5, asset_1_reserves=1_000_000, asset_2_reserves=5_000_000, total_fee_share=TOTAL_FEE_SHARE),
+        ]
+        self.assertEqual(get_route_hops(pools, [10, 7, 5]), THREE_HOP_ROUTE[:2])
+        self.assertEqual(get_route_hops(pools[::-1], [5, 7, 10]), [(5_000_000, 1_000_000, TOTAL_FEE_SHARE), (2_000_000, 1_000_000, TOTAL_FEE_SHARE)])
+
+        with self.assertRaises(SwapError):
+            get_route_hops(pools, [10, 5, 7])
+
+    def test_insufficient_reserves(self):
+        with self.assertRaises(SwapError):
+            quote_fixed_output(THREE_HOP_ROUTE, 3_000_000)
+        with self.assertRaises(SwapError):
+            quote_fixed_input([(1, 1, TOTAL_FEE_SHARE)], 1000)
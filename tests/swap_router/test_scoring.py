@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+from swap_router.graph import PoolGraph
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT
+from swap_router.scoring import get_best_scored_routes, get_route_fee_amount, score_routes
+from tests.swap_router.test_graph import create_pool
+
+
+class RouteScoringTestCase(TestCase):
+
+    def setUp(self):
+        self.asset_a_id = 10
+        self.asset_b_id = 7
+        self.asset_c_id = 5
+
+        # The router route (Asset B) has a better price and the direct pool has less liquidity.
+        self.pools = [
+            create_pool(self.asset_a_id, self.asset_b_id, 1_000_000_000, 2_000_000_000),
+            create_pool(self.asset_b_id, self.asset_c_id, 1_000_000_000, 5_000_000_000),
+            create_pool(self.asset_a_id, self.asset_c_id, 100_000_000, 990_000_000),
+        ]
+        self.algo_pool = create_pool(self.asset_a_id, 0, 1_000_000_000, 1_000_000_000)
+        self.graph = PoolGraph(self.pools + [self.algo_pool])
+
+    def test_route_fee_amount(self):
+        # Single swap
+        self.assertEqual(get_route_fee_amount(FIXED_INPUT, 1), 3000)
+        self.assertEqual(get_route_fee_amount(FIXED_OUTPUT, 1), 3000)
+        self.assertEqual(get_route_fee_amount(FIXED_OUTPUT, 1, has_change=True), 4000)
+        # The router requires 6 more transactions than a single swap.
+        self.assertEqual(get_route_fee_amount(FIXED_INPUT, 2), 9000)
+        self.assertEqual(get_route_fee_amount(FIXED_OUTPUT, 2), 9000)
+        self.assertEqual(get_route_fee_amount(FIXED_OUTPUT, 2, has_change=True), 10000)
+
+    def test_small_swap(self):
+        # The router route has a higher output amount but the direct swap is better net of the fees.
+        scored_routes = get_best_scored_routes(self.graph, self.asset_a_id, self.asset_c_id, 100_000, k=2)
+        self.assertEqual([r.route.asset_ids for r in scored_routes], [(self.asset_a_id, self.asset_c_id), (self.asset_a_id, self.asset_b_id, self.asset_c_id)])
+        self.assertEqual([r.quote.output_amount for r in scored_routes], [986046, 993712])
+        self.assertEqual([r.fee_amount for r in scored_routes], [3000, 9000])
+        self.assertEqual([r.input_fee_amount for r in scored_routes], [3010, 9028])
+        self.assertEqual([r.net_amount for r in scored_routes], [956405, 904031])
+
+        scored_routes = get_best_scored_routes(self.graph, self.asset_a_id, self.asset_c_id, 500_000, mode=FIXED_OUTPUT)
+        self.assertEqual(scored_routes[0].route.asset_ids, (self.asset_a_id, self.asset_c_id))
+        self.assertEqual(scored_routes[0].net_amount, 50_683 + 3010)
+
+        scored_routes = get_best_scored_routes(self.graph, self.asset_a_id, self.asset_c_id, 500_000, mode=FIXED_OUTPUT, has_change=True, k=2)
+        self.assertEqual([r.fee_amount for r in scored_routes], [4000, 10000])
+
+    def test_large_swap(self):
+        scored_routes = get_best_scored_routes(self.graph, self.asset_a_id, self.asset_c_id, 10_000_000)
+        self.assertEqual(scored_routes[0].route.asset_ids, (self.asset_a_id, self.asset_b_id, self.asset_c_id))
+        self.assertEqual(scored_routes[0].net_amount, 96435163)
+
+        scored_routes = get_best_scored_routes(self.graph, self.asset_a_id, self.asset_c_id, 50_000_000, mode=FIXED_OUTPUT)
+        self.assertEqual(scored_routes[0].route.asset_ids, (self.asset_a_id, self.asset_b_id, self.asset_c_id))
+        self.assertEqual(scored_routes[0].net_amount, 5_106_815 + 9028)
+
+    def test_without_algo_pool(self):
+        # The fees can't be converted to the input asset, they aren't included.
+        graph = PoolGraph(self.pools)
+        scored_routes = score_routes(graph, self.asset_a_id, self.asset_c_id, 100_000)
+        self.assertEqual({r.input_fee_amount for r in scored_routes}, {None})
+        self.assertEqual({r.net_amount for r in scored_routes}, {r.quote.output_amount for r in scored_routes})
@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT, SwapError, quote_fixed_input, quote_fixed_output
+from swap_router.slippage import get_maximum_input_amount, get_minimum_output_amount, get_swap_amounts
+from tests.swap_router.test_quote import THREE_HOP_ROUTE, TOTAL_FEE_SHARE
+
+
+class SlippageTestCase(TestCase):
+
+    def test_fixed_input(self):
+        # 1000 -> 29367, 0.5% slippage
+        swap_amounts = get_swap_amounts(THREE_HOP_ROUTE, FIXED_INPUT, 1000, 50)
+        self.assertEqual(swap_amounts[:3], (1000, 29220, 0))
+        self.assertEqual(swap_amounts.quote.output_amount, 29367)
+
+        # The price of the first pool moves less than the tolerance.
+        hops = [(1_002_000, 1_996_000, TOTAL_FEE_SHARE)] + THREE_HOP_ROUTE[1:]
+        self.assertGreaterEqual(quote_fixed_input(hops, 1000, minimum_output_amount=swap_amounts.amount).output_amount, swap_amounts.amount)
+
+    def test_fixed_output(self):
+        # 987 -> 29000, 0.5% slippage
+        swap_amounts = get_swap_amounts(THREE_HOP_ROUTE, FIXED_OUTPUT, 29000, 50)
+        self.assertEqual(swap_amounts[:3], (992, 29000, 5))
+        self.assertEqual(swap_amounts.quote.input_amount, 987)
+
+        hops = [(1_002_000, 1_996_000, TOTAL_FEE_SHARE)] + THREE_HOP_ROUTE[1:]
+        self.assertLessEqual(quote_fixed_output(hops, 29000, input_amount=swap_amounts.input_amount).input_amount, swap_amounts.input_amount)
+
+        self.assertEqual(get_swap_amounts(THREE_HOP_ROUTE, FIXED_OUTPUT, 29000, 0)[:3], (987, 29000, 0))
+
+    def test_rounding(self):
+        self.assertEqual(get_minimum_output_amount(29367, 50), 29220)
+        self.assertEqual(get_minimum_output_amount(1, 50), 1)
+        self.assertEqual(get_maximum_input_amount(987, 50), 992)
+        self.assertEqual(get_maximum_input_amount(1000, 50), 1005)
+        with self.assertRaises(SwapError):
+            get_maximum_input_amount(2 ** 64 - 1, 1)
+        with self.assertRaises(ValueError):
+            get_minimum_output_amount(1000, 10000)
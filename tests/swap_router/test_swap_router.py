@@ -14,8 +14,18 @@ from algosdk.logic import get_application_address
 
 from tests.constants import MAX_ASSET_AMOUNT, APPLICATION_ID as AMM_APPLICATION_ID
 from tests.core import BaseTestCase
+from swap_router.transactions import prepare_swap_transactions, sign_transactions
+from tests.utils import itob
 
 swap_router_program = TealishProgram('contracts/swap_router/swap_router_approval.tl')
+# The swap amounts read from the AMM logs are verified with the balance changes.
+swap_router_verification_program = TealishProgram(
+    tealish=open('contracts/swap_router/swap_router_approval.tl').read().replace(
+        'const int VERIFY_SWAP_AMOUNTS = 0', 'const int VERIFY_SWAP_AMOUNTS = 1'
+    )
+)
+# The resource sharing variant is generated from the same source, see generate_resource_sharing_source.py.
+swap_router_resource_sharing_program = TealishProgram('contracts/swap_router/swap_router_approval_resource_sharing.tl')
 swap_clear_state_program = TealishProgram('contracts/swap_router/swap_router_clear_state.tl')
 
 SWAP_ROUTER_APP_ID = 20
@@ -48,36 +58,42 @@ class CreateAppTestCase(TestCase):
         self.ledger.set_account_balance(self.app_creator_address, 1_000_000)
 
     def test_create_app(self):
-        txn = transaction.ApplicationCreateTxn(
-            sender=self.app_creator_address,
-            sp=self.sp,
-            on_complete=transaction.OnComplete.NoOpOC,
-            approval_program=swap_router_program.bytecode,
-            clear_program=swap_clear_state_program.bytecode,
-            global_schema=transaction.StateSchema(num_uints=1, num_byte_slices=2),
-            local_schema=transaction.StateSchema(num_uints=0, num_byte_slices=0),
-            foreign_apps=[9988776655],
-            extra_pages=0,
-        )
-        stxn = txn.sign(self.app_creator_sk)
+        # The approval programs require a single extra program page.
+        for approval_program in [swap_router_program, swap_router_resource_sharing_program]:
+            with self.subTest(approval_program=approval_program.filename):
+                self.setUp()
+                txn = transaction.ApplicationCreateTxn(
+                    sender=self.app_creator_address,
+                    sp=self.sp,
+                    on_complete=transaction.OnComplete.NoOpOC,
+                    approval_program=approval_program.bytecode,
+                    clear_program=swap_clear_state_program.bytecode,
+                    global_schema=transaction.StateSchema(num_uints=1, num_byte_slices=2),
+                    local_schema=transaction.StateSchema(num_uints=0, num_byte_slices=0),
+                    foreign_apps=[9988776655],
+                    extra_pages=1,
+                )
+                stxn = txn.sign(self.app_creator_sk)
 
-        block = self.ledger.eval_transactions(transactions=[stxn])
-        block_txns = block[b'txns']
+                block = self.ledger.eval_transactions(transactions=[stxn])
+                block_txns = block[b'txns']
 
-        txn = block_txns[0]
-        app_id = txn[b'apid']
-        global_state = self.ledger.get_global_state(app_id)
-        self.assertEqual(
-            global_state,
-            {
-                b"tinyman_app_id": 9988776655,
-                b"manager": decode_address(self.app_creator_address),
-                b"extra_collector": decode_address(self.app_creator_address)
-            }
-        )
+                txn = block_txns[0]
+                app_id = txn[b'apid']
+                global_state = self.ledger.get_global_state(app_id)
+                self.assertEqual(
+                    global_state,
+                    {
+                        b"tinyman_app_id": 9988776655,
+                        b"manager": decode_address(self.app_creator_address),
+                        b"extra_collector": decode_address(self.app_creator_address)
+                    }
+                )
 
 
 class SwapRouterTestCase(BaseTestCase):
+    approval_program = swap_router_program
+
     @classmethod
     def setUpClass(cls):
         cls.sp = get_suggested_params()
@@ -87,9 +103,10 @@ class SwapRouterTestCase(BaseTestCase):
         cls.asset_a_id = 10
         cls.asset_b_id = 7
         cls.asset_c_id = 5
+        cls.asset_d_id = 3
 
     def create_swap_router_app(self):
-        self.ledger.create_app(app_id=SWAP_ROUTER_APP_ID, approval_program=swap_router_program, creator=self.app_creator_address)
+        self.ledger.create_app(app_id=SWAP_ROUTER_APP_ID, approval_program=self.approval_program, creator=self.app_creator_address)
         self.ledger.set_account_balance(SWAP_ROUTER_ADDRESS, MINIMUM_BALANCE)
         self.ledger.set_global_state(
             SWAP_ROUTER_APP_ID,
@@ -172,6 +189,40 @@ class AssetOptInTestCase(SwapRouterTestCase):
             }
         )
 
+    def test_asset_opt_in_with_multiple_app_calls(self):
+        # Assume that min balance requirement is already covered.
+        self.ledger.set_account_balance(SWAP_ROUTER_ADDRESS, MINIMUM_BALANCE * 100)
+        self.ledger.opt_in_asset(SWAP_ROUTER_ADDRESS, self.asset_b_id)
+        self.ledger.create_asset(asset_id=self.asset_d_id)
+
+        # The first app call pays the fees of the group.
+        txn_group = [
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["asset_opt_in"],
+                foreign_assets=[self.asset_a_id, self.asset_b_id],
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["asset_opt_in"],
+                foreign_assets=[self.asset_c_id, self.asset_d_id],
+            )
+        ]
+        txn_group[0].fee = 2000 + 3000
+        txn_group[1].fee = 0
+
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        # Asset B is skipped, the app is already opted in.
+        self.assertEqual([itxn[b'txn'][b'xaid'] for itxn in txns[0][b'dt'][b'itx']], [self.asset_a_id])
+        self.assertEqual([itxn[b'txn'][b'xaid'] for itxn in txns[1][b'dt'][b'itx']], [self.asset_c_id, self.asset_d_id])
+
 
 class SwapTestCase(SwapRouterTestCase):
 
@@ -187,6 +238,16 @@ class SwapTestCase(SwapRouterTestCase):
         swap_event_signature = get_event_signature(event_name="swap", event_args=swap_event_args)
         cls.swap_event_selector = get_selector(signature=swap_event_signature)
 
+        swap_hop_event_args = [
+            Argument(arg_type="uint8", name="pool_index"),
+            Argument(arg_type="uint64", name="input_asset_id"),
+            Argument(arg_type="uint64", name="output_asset_id"),
+            Argument(arg_type="uint64", name="input_amount"),
+            Argument(arg_type="uint64", name="output_amount")
+        ]
+        swap_hop_event_signature = get_event_signature(event_name="swap_hop", event_args=swap_hop_event_args)
+        cls.swap_hop_event_selector = get_selector(signature=swap_hop_event_signature)
+
     def reset_ledger(self):
         self.ledger = JigLedger()
         self.create_amm_app()
@@ -202,6 +263,64 @@ class SwapTestCase(SwapRouterTestCase):
         self.ledger.opt_in_asset(SWAP_ROUTER_ADDRESS, self.asset_c_id)
         self.ledger.move(3 * MINIMUM_BALANCE, sender=self.user_addr, receiver=SWAP_ROUTER_ADDRESS)
 
+    def create_pool(self, input_asset_id, output_asset_id, input_reserves, output_reserves):
+        asset_1_id, asset_2_id = sorted([input_asset_id, output_asset_id], reverse=True)
+        pool_address, pool_token_asset_id = self.bootstrap_pool(asset_1_id, asset_2_id)
+        self.ledger.opt_in_asset(self.user_addr, pool_token_asset_id)
+        self.set_initial_pool_liquidity(
+            pool_address=pool_address,
+            asset_1_id=asset_1_id,
+            asset_2_id=asset_2_id,
+            pool_token_asset_id=pool_token_asset_id,
+            asset_1_reserves=input_reserves if asset_1_id == input_asset_id else output_reserves,
+            asset_2_reserves=output_reserves if asset_1_id == input_asset_id else input_reserves,
+            liquidity_provider_address=self.user_addr
+        )
+        return pool_address
+
+    def get_swap_transactions(self, input_asset_id, input_amount, app_args, route_asset_ids, pool_addresses, app_call_fee):
+        txn_group = [
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=input_amount,
+                index=input_asset_id
+            ) if input_asset_id else
+            transaction.PaymentTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=input_amount,
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=app_args,
+                accounts=pool_addresses,
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            )
+        ]
+        txn_group[1].fee = app_call_fee
+
+        txn_group = transaction.assign_group_id(txn_group)
+        return self.sign_txns(txn_group, self.user_sk)
+
+    def create_three_hop_route(self):
+        self.ledger.set_account_balance(self.user_addr, MAX_ASSET_AMOUNT, asset_id=self.asset_d_id)
+        self.ledger.opt_in_asset(SWAP_ROUTER_ADDRESS, self.asset_d_id)
+        self.ledger.move(MINIMUM_BALANCE, sender=self.user_addr, receiver=SWAP_ROUTER_ADDRESS)
+
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id, self.asset_d_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_c_id, self.asset_d_id, 1_000_000, 3_000_000),
+        ]
+        return route_asset_ids, pool_addresses
+
     def test_fixed_input_swap(self):
         test_cases = [
             {
@@ -309,7 +428,7 @@ class SwapTestCase(SwapRouterTestCase):
                 txns = block[b'txns']
 
                 logs = txns[1][b'dt'].get(b'lg')
-                event_log = logs[0]
+                event_log = logs[-1]
                 self.assertEqual(event_log[:4], self.swap_event_selector)
                 self.assertEqual(int.from_bytes(event_log[4:12], 'big'), input_asset_id)
                 self.assertEqual(int.from_bytes(event_log[12:20], 'big'), output_asset_id)
@@ -599,7 +718,7 @@ class SwapTestCase(SwapRouterTestCase):
                 txns = block[b'txns']
 
                 logs = txns[1][b'dt'].get(b'lg')
-                event_log = logs[0]
+                event_log = logs[-1]
                 self.assertEqual(event_log[:4], self.swap_event_selector)
                 self.assertEqual(int.from_bytes(event_log[4:12], 'big'), input_asset_id)
                 self.assertEqual(int.from_bytes(event_log[12:20], 'big'), output_asset_id)
@@ -809,6 +928,1132 @@ class SwapTestCase(SwapRouterTestCase):
                         }
                     )
 
+    def test_fixed_input_swap_with_three_hops(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 3_000_000
+        route_amounts = [1000, 1992, 9915, 29367]
+        input_amount = route_amounts[0]
+        output_amount = route_amounts[-1]
+        minimum_output = 29000
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "fixed-input", minimum_output],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'].get(b'lg')
+        self.assertEqual(len(logs), 4)
+        event_log = logs[-1]
+        self.assertEqual(event_log[:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(event_log[4:12], 'big'), self.asset_a_id)
+        self.assertEqual(int.from_bytes(event_log[12:20], 'big'), self.asset_d_id)
+        self.assertEqual(int.from_bytes(event_log[20:28], 'big'), input_amount)
+        self.assertEqual(int.from_bytes(event_log[28:36], 'big'), output_amount)
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 7)
+
+        for i in range(3):
+            with self.subTest(hop=i):
+                hop_event_log = logs[i]
+                self.assertEqual(hop_event_log[:4], self.swap_hop_event_selector)
+                self.assertEqual(len(hop_event_log), 37)
+                self.assertEqual(hop_event_log[4], i + 1)
+                self.assertEqual(int.from_bytes(hop_event_log[5:13], 'big'), route_asset_ids[i])
+                self.assertEqual(int.from_bytes(hop_event_log[13:21], 'big'), route_asset_ids[i + 1])
+                self.assertEqual(int.from_bytes(hop_event_log[21:29], 'big'), route_amounts[i])
+                self.assertEqual(int.from_bytes(hop_event_log[29:37], 'big'), route_amounts[i + 1])
+
+                self.assertEqual(inner_transactions[i * 2][b'txn'][b'aamt'], route_amounts[i])
+                self.assertEqual(inner_transactions[i * 2][b'txn'][b'arcv'], decode_address(pool_addresses[i]))
+                swap_app_call = inner_transactions[i * 2 + 1]
+                self.assertEqual(
+                    swap_app_call[b'txn'][b'apaa'],
+                    [b'swap', b'fixed-input', int(minimum_output if i == 2 else 1).to_bytes(8, 'big')]
+                )
+                self.assertEqual(swap_app_call[b'txn'][b'apas'], route_asset_ids[i:i + 2])
+                self.assertEqual(swap_app_call[b'txn'][b'apat'], [decode_address(pool_addresses[i])])
+                self.assertEqual(swap_app_call[b'dt'][b'itx'][0][b'txn'][b'aamt'], route_amounts[i + 1])
+
+        self.assertDictEqual(
+            inner_transactions[6][b'txn'],
+            {
+                b'aamt': output_amount,
+                b'arcv': decode_address(self.user_addr),
+                b'fv': ANY,
+                b'lv': ANY,
+                b'snd': decode_address(SWAP_ROUTER_ADDRESS),
+                b'type': b'axfer',
+                b'xaid': self.asset_d_id
+            }
+        )
+
+    def test_fixed_output_swap_with_three_hops(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 3_000_000
+        route_amounts = [1000, 1992, 9915, 29367]
+        change_amount = 20
+        input_amount = route_amounts[0] + change_amount
+        output_amount = route_amounts[-1]
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "fixed-output", output_amount],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 11000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'].get(b'lg')
+        event_log = logs[-1]
+        self.assertEqual(event_log[:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(event_log[4:12], 'big'), self.asset_a_id)
+        self.assertEqual(int.from_bytes(event_log[12:20], 'big'), self.asset_d_id)
+        self.assertEqual(int.from_bytes(event_log[20:28], 'big'), input_amount - change_amount)
+        self.assertEqual(int.from_bytes(event_log[28:36], 'big'), output_amount)
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 8)
+
+        for i in range(3):
+            with self.subTest(hop=i):
+                self.assertEqual(inner_transactions[i * 2][b'txn'][b'aamt'], route_amounts[i])
+                self.assertEqual(inner_transactions[i * 2][b'txn'][b'arcv'], decode_address(pool_addresses[i]))
+                swap_app_call = inner_transactions[i * 2 + 1]
+                self.assertEqual(
+                    swap_app_call[b'txn'][b'apaa'],
+                    [b'swap', b'fixed-output', int(route_amounts[i + 1]).to_bytes(8, 'big')]
+                )
+                self.assertEqual(swap_app_call[b'txn'][b'apas'], route_asset_ids[i:i + 2])
+                self.assertEqual(swap_app_call[b'txn'][b'apat'], [decode_address(pool_addresses[i])])
+                self.assertEqual(len(swap_app_call[b'dt'][b'itx']), 1)
+
+        # Change
+        self.assertEqual(inner_transactions[6][b'txn'][b'aamt'], change_amount)
+        self.assertEqual(inner_transactions[6][b'txn'][b'xaid'], self.asset_a_id)
+        # Output
+        self.assertEqual(inner_transactions[7][b'txn'][b'aamt'], output_amount)
+        self.assertEqual(inner_transactions[7][b'txn'][b'xaid'], self.asset_d_id)
+
+    def test_fixed_output_tolerant_swap_with_three_hops(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 3_000_000
+        # The calculated input amounts are exact, the AMM swaps don't return change.
+        route_amounts = [987, 1968, 9791, 29000]
+        change_amount = 13
+        input_amount = route_amounts[0] + change_amount
+        output_amount = route_amounts[-1]
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "fixed-output-tolerant", output_amount],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 11000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        event_log = txns[1][b'dt'][b'lg'][-1]
+        self.assertEqual(event_log[:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(event_log[20:28], 'big'), route_amounts[0])
+        self.assertEqual(int.from_bytes(event_log[28:36], 'big'), output_amount)
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 8)
+        for i in range(3):
+            with self.subTest(hop=i):
+                self.assertEqual(inner_transactions[i * 2][b'txn'][b'aamt'], route_amounts[i])
+        self.assertEqual(inner_transactions[6][b'txn'][b'aamt'], change_amount)
+        self.assertEqual(inner_transactions[6][b'txn'][b'xaid'], self.asset_a_id)
+        self.assertEqual(inner_transactions[7][b'txn'][b'aamt'], output_amount)
+        self.assertEqual(inner_transactions[7][b'txn'][b'xaid'], self.asset_d_id)
+
+    def create_route_with_reused_pool(self):
+        # Asset A -> Asset B -> Asset A -> Asset C, the first two hops use the same pool.
+        # The route amounts are calculated with the initial pool states, the second hop amount is stale after the first hop.
+        pool_ab_address = self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000)
+        pool_ac_address = self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 5_000_000)
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_a_id, self.asset_c_id]
+        pool_addresses = [pool_ab_address, pool_ab_address, pool_ac_address]
+        return route_asset_ids, pool_addresses
+
+    def test_fixed_output_tolerant_swap_with_change(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_route_with_reused_pool()
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: Pool-1 after the first hop, 1_001_826 - 1_996_365
+        # Pool-3: 1_000_000 - 5_000_000
+        # The second hop requires 3622 Asset B instead of 3635, the AMM returns 13 Asset B as change.
+        route_amounts = [1826, 3635, 1809, 9000]
+        hop_change_amount = 13
+        change_amount = 74
+        input_amount = route_amounts[0] + change_amount
+        output_amount = route_amounts[-1]
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "fixed-output-tolerant", output_amount],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 13000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'][b'lg']
+        hop_event_log = logs[1]
+        self.assertEqual(hop_event_log[:4], self.swap_hop_event_selector)
+        self.assertEqual(int.from_bytes(hop_event_log[21:29], 'big'), route_amounts[1] - hop_change_amount)
+        self.assertEqual(int.from_bytes(hop_event_log[29:37], 'big'), route_amounts[2])
+
+        event_log = logs[-1]
+        self.assertEqual(event_log[:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(event_log[20:28], 'big'), route_amounts[0])
+        self.assertEqual(int.from_bytes(event_log[28:36], 'big'), output_amount)
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 9)
+
+        # The AMM returns the change of the second hop to the router.
+        amm_inner_transactions = inner_transactions[3][b'dt'][b'itx']
+        self.assertEqual(len(amm_inner_transactions), 2)
+        self.assertIn(
+            (self.asset_b_id, hop_change_amount),
+            [(itxn[b'txn'][b'xaid'], itxn[b'txn'][b'aamt']) for itxn in amm_inner_transactions]
+        )
+
+        # The router forwards the change of the intermediary hop to the user.
+        self.assertDictEqual(
+            inner_transactions[4][b'txn'],
+            {
+                b'aamt': hop_change_amount,
+                b'arcv': decode_address(self.user_addr),
+                b'fv': ANY,
+                b'lv': ANY,
+                b'snd': decode_address(SWAP_ROUTER_ADDRESS),
+                b'type': b'axfer',
+                b'xaid': self.asset_b_id
+            }
+        )
+        self.assertEqual(inner_transactions[5][b'txn'][b'aamt'], route_amounts[2])
+        self.assertEqual(inner_transactions[5][b'txn'][b'arcv'], decode_address(pool_addresses[2]))
+
+        # Change
+        self.assertEqual(inner_transactions[7][b'txn'][b'aamt'], change_amount)
+        self.assertEqual(inner_transactions[7][b'txn'][b'xaid'], self.asset_a_id)
+        self.assertEqual(inner_transactions[7][b'txn'][b'arcv'], decode_address(self.user_addr))
+        # Output
+        self.assertEqual(inner_transactions[8][b'txn'][b'aamt'], output_amount)
+        self.assertEqual(inner_transactions[8][b'txn'][b'xaid'], self.asset_c_id)
+        self.assertEqual(inner_transactions[8][b'txn'][b'arcv'], decode_address(self.user_addr))
+
+    def test_fixed_output_swap_with_change(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_route_with_reused_pool()
+
+        # The same route fails without the tolerant mode, the second hop returns change.
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=1900,
+            app_args=["swap", "fixed-output", 9000],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 13000,
+        )
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert(is_change_allowed)')
+
+    def test_swap_with_prepared_transactions(self):
+        self.reset_ledger()
+        pool_address = self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000)
+
+        # 903 Asset A -> 9000 Asset C, the change is 97. The fee of fixed-output swaps covers the change transfer by default.
+        txn_group = prepare_swap_transactions(
+            sender=self.user_addr,
+            suggested_params=self.sp,
+            router_app_id=SWAP_ROUTER_APP_ID,
+            amm_app_id=AMM_APPLICATION_ID,
+            route_asset_ids=[self.asset_a_id, self.asset_c_id],
+            pool_addresses=[pool_address],
+            mode="fixed-output",
+            input_amount=1000,
+            amount=9000,
+        )
+        self.assertEqual(txn_group[1].fee, 1000 + 5000)
+        block = self.ledger.eval_transactions(sign_transactions([txn_group], self.user_sk)[0])
+
+        inner_transactions = block[b'txns'][1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 5)
+
+    def test_swap_with_invalid_route(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=1000,
+            app_args=["swap", "fixed-input", 1],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses[:2],
+            app_call_fee=1000 + 10000,
+        )
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert(get_route_asset_count() == (hop_count + 1))')
+
+    def test_fixed_input_split_swap(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000),
+        ]
+        # Route 1: Asset A -> (Pool-1) -> Asset B -> (Pool-2) -> Asset C
+        # Route 2: Asset A -> (Pool-3) -> Asset C
+        route_1 = bytes([0, 1, 1, 2, 2])
+        route_2 = bytes([0, 3, 2])
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 10_000_000
+        route_1_input_amount = 1000
+        route_1_output_amount = 9915
+        route_2_input_amount = 1000
+        route_2_output_amount = 9960
+        input_amount = route_1_input_amount + route_2_input_amount
+        output_amount = route_1_output_amount + route_2_output_amount
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "fixed-input-split", output_amount, route_1_input_amount, route_1, route_2],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'].get(b'lg')
+        self.assertEqual(len(logs), 4)
+        event_log = logs[-1]
+        self.assertEqual(event_log[:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(event_log[4:12], 'big'), self.asset_a_id)
+        self.assertEqual(int.from_bytes(event_log[12:20], 'big'), self.asset_c_id)
+        self.assertEqual(int.from_bytes(event_log[20:28], 'big'), input_amount)
+        self.assertEqual(int.from_bytes(event_log[28:36], 'big'), output_amount)
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 7)
+
+        # Route 1
+        self.assertEqual(inner_transactions[0][b'txn'][b'aamt'], route_1_input_amount)
+        self.assertEqual(inner_transactions[0][b'txn'][b'arcv'], decode_address(pool_addresses[0]))
+        self.assertEqual(inner_transactions[1][b'txn'][b'apas'], [self.asset_a_id, self.asset_b_id])
+        self.assertEqual(inner_transactions[2][b'txn'][b'arcv'], decode_address(pool_addresses[1]))
+        self.assertEqual(inner_transactions[3][b'txn'][b'apas'], [self.asset_b_id, self.asset_c_id])
+        self.assertEqual(inner_transactions[3][b'dt'][b'itx'][0][b'txn'][b'aamt'], route_1_output_amount)
+        # Route 2
+        self.assertEqual(inner_transactions[4][b'txn'][b'aamt'], route_2_input_amount)
+        self.assertEqual(inner_transactions[4][b'txn'][b'arcv'], decode_address(pool_addresses[2]))
+        self.assertEqual(inner_transactions[5][b'txn'][b'apas'], [self.asset_a_id, self.asset_c_id])
+        self.assertEqual(inner_transactions[5][b'dt'][b'itx'][0][b'txn'][b'aamt'], route_2_output_amount)
+        # Output
+        self.assertDictEqual(
+            inner_transactions[6][b'txn'],
+            {
+                b'aamt': output_amount,
+                b'arcv': decode_address(self.user_addr),
+                b'fv': ANY,
+                b'lv': ANY,
+                b'snd': decode_address(SWAP_ROUTER_ADDRESS),
+                b'type': b'axfer',
+                b'xaid': self.asset_c_id
+            }
+        )
+
+        # Minimum output amount is checked against the total output
+        self.reset_ledger()
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000),
+        ]
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "fixed-input-split", output_amount + 1, route_1_input_amount, route_1, route_2],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert(output_amount >= minimum_output_amount)')
+
+    def test_fixed_input_split_swap_with_incomplete_route(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000),
+        ]
+        # Route 1 ends with the intermediary asset
+        route_1 = bytes([0, 1, 1])
+        route_2 = bytes([0, 2, 2])
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=2000,
+            app_args=["swap", "fixed-input-split", 1, 1000, route_1, route_2],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 7000,
+        )
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert(getbyte(route, len(route) - 1) == (get_route_asset_count() - 1))')
+
+    def test_arbitrage(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_c_id, self.asset_a_id, 1_000_000, 1_000_000),
+        ]
+        # Route: Asset A -> (Pool-1) -> Asset B -> (Pool-2) -> Asset C -> (Pool-3) -> Asset A
+        route = bytes([0, 1, 1, 2, 2, 3, 0])
+
+        arbitrage_event_args = [
+            Argument(arg_type="uint64", name="asset_id"),
+            Argument(arg_type="uint64", name="input_amount"),
+            Argument(arg_type="uint64", name="output_amount"),
+            Argument(arg_type="uint64", name="profit_amount")
+        ]
+        arbitrage_event_selector = get_selector(signature=get_event_signature(event_name="arbitrage", event_args=arbitrage_event_args))
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 1_000_000
+        route_amounts = [1000, 1992, 9915, 9789]
+        input_amount = route_amounts[0]
+        output_amount = route_amounts[-1]
+        minimum_profit_amount = 8000
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=["swap", "arbitrage", minimum_profit_amount, route],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'][b'lg']
+        self.assertEqual(len(logs), 4)
+        event_log = logs[-1]
+        self.assertEqual(event_log[:4], arbitrage_event_selector)
+        self.assertEqual(int.from_bytes(event_log[4:12], 'big'), self.asset_a_id)
+        self.assertEqual(int.from_bytes(event_log[12:20], 'big'), input_amount)
+        self.assertEqual(int.from_bytes(event_log[20:28], 'big'), output_amount)
+        self.assertEqual(int.from_bytes(event_log[28:36], 'big'), output_amount - input_amount)
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 7)
+        self.assertDictEqual(
+            inner_transactions[6][b'txn'],
+            {
+                b'aamt': output_amount,
+                b'arcv': decode_address(self.user_addr),
+                b'fv': ANY,
+                b'lv': ANY,
+                b'snd': decode_address(SWAP_ROUTER_ADDRESS),
+                b'type': b'axfer',
+                b'xaid': self.asset_a_id
+            }
+        )
+
+    def test_arbitrage_minimum_profit(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_c_id, self.asset_a_id, 1_000_000, 1_000_000),
+        ]
+        # 1000 Asset A -> 9789 Asset A, the profit is 8789.
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=1000,
+            app_args=["swap", "arbitrage", 8790, bytes([0, 1, 1, 2, 2, 3, 0])],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        with self.assertRaises(LogicEvalError):
+            self.ledger.eval_transactions(stxns)
+
+        # The route must end with the input asset.
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=1000,
+            app_args=["swap", "arbitrage", 0, bytes([0, 1, 1, 2, 2])],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert(!getbyte(route, len(route) - 1))')
+
+    def test_quote(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        quote_event_args = [
+            Argument(arg_type="uint64", name="input_asset_id"),
+            Argument(arg_type="uint64", name="output_asset_id"),
+            Argument(arg_type="uint64", name="input_amount"),
+            Argument(arg_type="uint64", name="output_amount")
+        ]
+        quote_event_selector = get_selector(signature=get_event_signature(event_name="quote", event_args=quote_event_args))
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 3_000_000
+        test_cases = [
+            {"mode": "fixed-input", "amount": 1000, "input_amount": 1000, "output_amount": 29367},
+            {"mode": "fixed-output", "amount": 29367, "input_amount": 1000, "output_amount": 29367},
+            {"mode": "fixed-output", "amount": 29000, "input_amount": 987, "output_amount": 29000},
+        ]
+        for test_case in test_cases:
+            with self.subTest(**test_case):
+                txn_group = [
+                    transaction.ApplicationNoOpTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        index=SWAP_ROUTER_APP_ID,
+                        app_args=["quote", test_case["mode"], test_case["amount"]],
+                        accounts=pool_addresses,
+                        foreign_apps=[AMM_APPLICATION_ID],
+                        foreign_assets=route_asset_ids,
+                    )
+                ]
+                stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+                block = self.ledger.eval_transactions(stxns)
+                txn = block[b'txns'][0]
+
+                # No funds are moved
+                self.assertNotIn(b'itx', txn[b'dt'])
+
+                logs = txn[b'dt'][b'lg']
+                self.assertEqual(len(logs), 1)
+                event_log = logs[0]
+                self.assertEqual(event_log[:4], quote_event_selector)
+                self.assertEqual(int.from_bytes(event_log[4:12], 'big'), self.asset_a_id)
+                self.assertEqual(int.from_bytes(event_log[12:20], 'big'), self.asset_d_id)
+                self.assertEqual(int.from_bytes(event_log[20:28], 'big'), test_case["input_amount"])
+                self.assertEqual(int.from_bytes(event_log[28:36], 'big'), test_case["output_amount"])
+
+    def test_quote_with_invalid_pool(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        txn_group = [
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["quote", "fixed-input", 1000],
+                accounts=list(reversed(pool_addresses)),
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            )
+        ]
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert((input_asset_id == asset_2_id) && (output_asset_id == asset_1_id))')
+
+    def test_batch_swap(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000),
+        ]
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 10_000_000
+        # Instruction 1: Fixed Input, Asset A -> (Pool-1) -> Asset B -> (Pool-2) -> Asset C
+        instruction_1_input_amount = 1000
+        instruction_1_output_amount = 9915
+        instruction_1 = itob(instruction_1_output_amount) + bytes([0]) + bytes([0, 1, 1, 2, 2])
+        # Instruction 2: Fixed Output, Asset A -> (Pool-3) -> Asset C
+        instruction_2_input_amount = 1000
+        instruction_2_output_amount = 9000
+        instruction_2_change_amount = 1000 - 903
+        instruction_2 = itob(instruction_2_output_amount) + bytes([1]) + bytes([0, 3, 2])
+
+        txn_group = [
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=instruction_1_input_amount,
+                index=self.asset_a_id
+            ),
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=instruction_2_input_amount,
+                index=self.asset_a_id
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["batch_swap", instruction_1, instruction_2],
+                accounts=pool_addresses,
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            )
+        ]
+        txn_group[2].fee = 1000 + 12000
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[2][b'dt'].get(b'lg')
+        self.assertEqual(len(logs), 5)
+        # Instruction 1
+        self.assertEqual(logs[2][:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(logs[2][4:12], 'big'), self.asset_a_id)
+        self.assertEqual(int.from_bytes(logs[2][12:20], 'big'), self.asset_c_id)
+        self.assertEqual(int.from_bytes(logs[2][20:28], 'big'), instruction_1_input_amount)
+        self.assertEqual(int.from_bytes(logs[2][28:36], 'big'), instruction_1_output_amount)
+        # Instruction 2
+        self.assertEqual(logs[4][:4], self.swap_event_selector)
+        self.assertEqual(int.from_bytes(logs[4][4:12], 'big'), self.asset_a_id)
+        self.assertEqual(int.from_bytes(logs[4][12:20], 'big'), self.asset_c_id)
+        self.assertEqual(int.from_bytes(logs[4][20:28], 'big'), instruction_2_input_amount - instruction_2_change_amount)
+        self.assertEqual(int.from_bytes(logs[4][28:36], 'big'), instruction_2_output_amount)
+
+        inner_transactions = txns[2][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 9)
+
+        # Instruction 1: 2 swaps, output
+        self.assertEqual(inner_transactions[1][b'txn'][b'apaa'][:2], [b'swap', b'fixed-input'])
+        self.assertEqual(inner_transactions[3][b'txn'][b'apaa'][:2], [b'swap', b'fixed-input'])
+        self.assertEqual(inner_transactions[4][b'txn'][b'aamt'], instruction_1_output_amount)
+        self.assertEqual(inner_transactions[4][b'txn'][b'arcv'], decode_address(self.user_addr))
+        # Instruction 2: 1 swap, change, output
+        self.assertEqual(inner_transactions[5][b'txn'][b'aamt'], instruction_2_input_amount - instruction_2_change_amount)
+        self.assertEqual(inner_transactions[6][b'txn'][b'apaa'], [b'swap', b'fixed-output', itob(instruction_2_output_amount)])
+        self.assertEqual(inner_transactions[7][b'txn'][b'aamt'], instruction_2_change_amount)
+        self.assertEqual(inner_transactions[7][b'txn'][b'xaid'], self.asset_a_id)
+        self.assertEqual(inner_transactions[8][b'txn'][b'aamt'], instruction_2_output_amount)
+        self.assertEqual(inner_transactions[8][b'txn'][b'xaid'], self.asset_c_id)
+
+    def test_batch_swap_log_limit(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+        ]
+
+        # 9 two-hop instructions log 9 * (36 + 2 * 37) = 990 bytes, the limit is 1024 bytes.
+        instruction_count = 9
+        instruction = itob(1) + bytes([0]) + bytes([0, 1, 1, 2, 2])
+        txn_group = [
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=1000,
+                index=self.asset_a_id
+            )
+            for _ in range(instruction_count)
+        ]
+        txn_group.append(
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["batch_swap"] + [instruction] * instruction_count,
+                accounts=pool_addresses,
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            )
+        )
+        txn_group[-1].fee = 1000 + instruction_count * 7000
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+        block = self.ledger.eval_transactions(stxns)
+        logs = block[b'txns'][-1][b'dt'].get(b'lg')
+        self.assertEqual(len(logs), instruction_count * 3)
+        self.assertEqual(sum(len(log) for log in logs), 990)
+
+    def test_batch_swap_minimum_output(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+        ]
+        # 1000 Asset A -> 1992 Asset B
+        instruction = itob(1993) + bytes([0]) + bytes([0, 1, 1])
+
+        txn_group = [
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=1000,
+                index=self.asset_a_id
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["batch_swap", instruction],
+                accounts=pool_addresses,
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            )
+        ]
+        txn_group[1].fee = 1000 + 4000
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+        with self.assertRaises(LogicEvalError):
+            self.ledger.eval_transactions(stxns)
+
+    def test_batch_swap_with_invalid_instruction(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+        ]
+        # The first instruction is valid, the second instruction is validated before the first swap.
+        instruction = itob(1) + bytes([0]) + bytes([0, 1, 1])
+        test_cases = [
+            {"instruction": itob(1) + bytes([0]) + bytes([0]), "error": "assert(len(instruction) >= (9 + 3))"},
+            {"instruction": itob(1) + bytes([2]) + bytes([0, 1, 1]), "error": "assert(getbyte(instruction, 8) <= 1)"},
+            {"instruction": itob(1) + bytes([0]) + bytes([0, 1, 1, 1]), "error": "assert(route_length % 2)"},
+            {"instruction": itob(1) + bytes([0]) + bytes([2, 1, 1]), "error": "assert(getbyte(instruction, 9) < asset_count)"},
+            {"instruction": itob(1) + bytes([0]) + bytes([0, 1, 2]), "error": "assert(getbyte(instruction, 9 + (route_length - 1)) < asset_count)"},
+        ]
+        for test_case in test_cases:
+            with self.subTest(**test_case):
+                txn_group = [
+                    transaction.AssetTransferTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        receiver=SWAP_ROUTER_ADDRESS,
+                        amt=1000,
+                        index=self.asset_a_id
+                    ),
+                    transaction.AssetTransferTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        receiver=SWAP_ROUTER_ADDRESS,
+                        amt=1000,
+                        index=self.asset_a_id
+                    ),
+                    transaction.ApplicationNoOpTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        index=SWAP_ROUTER_APP_ID,
+                        app_args=["batch_swap", instruction, test_case["instruction"]],
+                        accounts=pool_addresses,
+                        foreign_apps=[AMM_APPLICATION_ID],
+                        foreign_assets=route_asset_ids,
+                    )
+                ]
+                txn_group[2].fee = 1000 + 8000
+                stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+                with self.assertRaises(LogicEvalError) as e:
+                    self.ledger.eval_transactions(stxns)
+                self.assertEqual(e.exception.source['line'], test_case["error"])
+
+    def test_swap_with_asset_opt_in(self):
+        self.reset_ledger()
+        # The application is not opted in to Asset D.
+        self.ledger.set_account_balance(self.user_addr, MAX_ASSET_AMOUNT, asset_id=self.asset_d_id)
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_d_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_d_id, 1_000_000, 5_000_000),
+        ]
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        input_amount = 1000
+        output_amount = 9915
+
+        txn_group = [
+            # Minimum balance increase of the application account
+            transaction.PaymentTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=MINIMUM_BALANCE,
+            ),
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=input_amount,
+                index=self.asset_a_id
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["swap", "fixed-input", output_amount],
+                accounts=pool_addresses,
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            )
+        ]
+        txn_group[2].fee = 1000 + 8000
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        inner_transactions = txns[2][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 6)
+        self.assertDictEqual(
+            inner_transactions[0][b'txn'],
+            {
+                b'arcv': decode_address(SWAP_ROUTER_ADDRESS),
+                b'fv': ANY,
+                b'lv': ANY,
+                b'snd': decode_address(SWAP_ROUTER_ADDRESS),
+                b'type': b'axfer',
+                b'xaid': self.asset_d_id
+            }
+        )
+        self.assertEqual(inner_transactions[5][b'txn'][b'aamt'], output_amount)
+        self.assertEqual(inner_transactions[5][b'txn'][b'xaid'], self.asset_d_id)
+
+    def test_arc4_swap(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 3_000_000
+        test_cases = [
+            {"method": "swap_fixed_input(txn,uint64)(uint64,uint64,uint64)", "amount": 29000, "input_amount": 1000, "output_amount": 29367, "change_amount": 0},
+            {"method": "swap_fixed_output(txn,uint64)(uint64,uint64,uint64)", "amount": 29367, "input_amount": 1000, "output_amount": 29367, "change_amount": 20},
+        ]
+        for test_case in test_cases:
+            with self.subTest(**test_case):
+                stxns = self.get_swap_transactions(
+                    input_asset_id=self.asset_a_id,
+                    input_amount=test_case["input_amount"] + test_case["change_amount"],
+                    app_args=[get_selector(test_case["method"]), test_case["amount"]],
+                    route_asset_ids=route_asset_ids,
+                    pool_addresses=pool_addresses,
+                    app_call_fee=1000 + 11000,
+                )
+                block = self.ledger.eval_transactions(stxns)
+                txns = block[b'txns']
+
+                logs = txns[1][b'dt'][b'lg']
+                self.assertEqual(logs[-2][:4], self.swap_event_selector)
+                self.assertEqual(
+                    logs[-1],
+                    bytes.fromhex("151f7c75") + itob(test_case["input_amount"]) + itob(test_case["output_amount"]) + itob(test_case["change_amount"])
+                )
+
+    def test_arc4_fixed_input_split_swap(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_a_id, self.asset_c_id, 1_000_000, 10_000_000),
+        ]
+        route_1 = bytes([0, 1, 1, 2, 2])
+        route_2 = bytes([0, 3, 2])
+
+        # values are pre-calculated according to pool reserves, see test_fixed_input_split_swap.
+        input_amount = 2000
+        output_amount = 9915 + 9960
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            # byte[] arguments have a 2 bytes length prefix.
+            app_args=[
+                get_selector("swap_fixed_input_split(txn,uint64,uint64,byte[],byte[])(uint64,uint64,uint64)"),
+                output_amount,
+                1000,
+                len(route_1).to_bytes(2, 'big') + route_1,
+                len(route_2).to_bytes(2, 'big') + route_2,
+            ],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'][b'lg']
+        self.assertEqual(len(logs), 5)
+        self.assertEqual(logs[-2][:4], self.swap_event_selector)
+        self.assertEqual(logs[-1], bytes.fromhex("151f7c75") + itob(input_amount) + itob(output_amount) + itob(0))
+
+    def test_arc4_arbitrage(self):
+        self.reset_ledger()
+        route_asset_ids = [self.asset_a_id, self.asset_b_id, self.asset_c_id]
+        pool_addresses = [
+            self.create_pool(self.asset_a_id, self.asset_b_id, 1_000_000, 2_000_000),
+            self.create_pool(self.asset_b_id, self.asset_c_id, 1_000_000, 5_000_000),
+            self.create_pool(self.asset_c_id, self.asset_a_id, 1_000_000, 1_000_000),
+        ]
+        route = bytes([0, 1, 1, 2, 2, 3, 0])
+
+        # values are pre-calculated according to pool reserves, see test_arbitrage.
+        input_amount = 1000
+        output_amount = 9789
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount,
+            app_args=[
+                get_selector("swap_arbitrage(txn,uint64,byte[])(uint64,uint64,uint64)"),
+                8000,
+                len(route).to_bytes(2, 'big') + route,
+            ],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 10000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'][b'lg']
+        self.assertEqual(len(logs), 5)
+        self.assertEqual(logs[-1], bytes.fromhex("151f7c75") + itob(input_amount) + itob(output_amount) + itob(0))
+
+    def test_arc4_fixed_output_tolerant_swap(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_route_with_reused_pool()
+
+        # values are pre-calculated according to pool reserves, see test_fixed_output_tolerant_swap_with_change.
+        # The change is the input change, the change of the intermediary hop is transferred separately.
+        input_amount = 1826
+        output_amount = 9000
+        change_amount = 74
+
+        stxns = self.get_swap_transactions(
+            input_asset_id=self.asset_a_id,
+            input_amount=input_amount + change_amount,
+            app_args=[get_selector("swap_fixed_output_tolerant(txn,uint64)(uint64,uint64,uint64)"), output_amount],
+            route_asset_ids=route_asset_ids,
+            pool_addresses=pool_addresses,
+            app_call_fee=1000 + 13000,
+        )
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'][b'lg']
+        self.assertEqual(len(logs), 5)
+        self.assertEqual(logs[-2][:4], self.swap_event_selector)
+        self.assertEqual(logs[-1], bytes.fromhex("151f7c75") + itob(input_amount) + itob(output_amount) + itob(change_amount))
+
+    def test_arc4_quote(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        test_cases = [
+            {"method": "quote_fixed_input(uint64)(uint64,uint64)", "amount": 1000, "input_amount": 1000, "output_amount": 29367},
+            {"method": "quote_fixed_output(uint64)(uint64,uint64)", "amount": 29000, "input_amount": 987, "output_amount": 29000},
+        ]
+        for test_case in test_cases:
+            with self.subTest(**test_case):
+                txn_group = [
+                    transaction.ApplicationNoOpTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        index=SWAP_ROUTER_APP_ID,
+                        app_args=[get_selector(test_case["method"]), test_case["amount"]],
+                        accounts=pool_addresses,
+                        foreign_apps=[AMM_APPLICATION_ID],
+                        foreign_assets=route_asset_ids,
+                    )
+                ]
+                stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+                block = self.ledger.eval_transactions(stxns)
+                txn = block[b'txns'][0]
+
+                logs = txn[b'dt'][b'lg']
+                self.assertEqual(len(logs), 2)
+                self.assertEqual(logs[1], bytes.fromhex("151f7c75") + itob(test_case["input_amount"]) + itob(test_case["output_amount"]))
+
+
+class SwapVerificationTestCase(SwapTestCase):
+    # Runs the swap tests with the program that verifies the amounts read from the AMM logs.
+    approval_program = swap_router_verification_program
+
+
+class SwapResourceSharingTestCase(SwapTestCase):
+    # Runs the swap tests with the resource sharing variant.
+    approval_program = swap_router_resource_sharing_program
+
+    def test_fixed_input_swap_with_shared_resources(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        # values are pre-calculated according to pool reserves
+        # Pool-1: 1_000_000 - 2_000_000
+        # Pool-2: 1_000_000 - 5_000_000
+        # Pool-3: 1_000_000 - 3_000_000
+        route_amounts = [1000, 1992, 9915, 29367]
+
+        txn_group = [
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=route_amounts[0],
+                index=self.asset_a_id
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["swap", "fixed-input", route_amounts[-1]],
+                accounts=pool_addresses[:1],
+                foreign_apps=[AMM_APPLICATION_ID],
+                foreign_assets=route_asset_ids,
+            ),
+            # The pools of the second and third hops are referenced by the next app call.
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["resources"],
+                accounts=pool_addresses[1:],
+                foreign_apps=[AMM_APPLICATION_ID],
+            ),
+        ]
+        txn_group[1].fee = 1000 + 10000
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        logs = txns[1][b'dt'][b'lg']
+        self.assertEqual(len(logs), 4)
+        for i in range(3):
+            with self.subTest(hop=i):
+                # The pool indexes continue in the "resources" app call.
+                self.assertEqual(logs[i][4], i + 1)
+                self.assertEqual(int.from_bytes(logs[i][21:29], 'big'), route_amounts[i])
+                self.assertEqual(int.from_bytes(logs[i][29:37], 'big'), route_amounts[i + 1])
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 7)
+        self.assertEqual(inner_transactions[6][b'txn'][b'aamt'], route_amounts[-1])
+        self.assertEqual(inner_transactions[6][b'txn'][b'xaid'], self.asset_d_id)
+
+    def test_swaps_with_shared_resources_in_the_same_group(self):
+        self.reset_ledger()
+        route_asset_ids, pool_addresses = self.create_three_hop_route()
+
+        # The references of a swap end at the first transaction which is not a "resources" app call.
+        # Swap 1: 1000 Asset A -> 1992 Asset B -> 9915 Asset C
+        # Swap 2: 1000 Asset C -> 2988 Asset D
+        txn_group = []
+        for input_asset_id, asset_ids, accounts in [
+            (self.asset_a_id, route_asset_ids[:3], pool_addresses[:2]),
+            (self.asset_c_id, route_asset_ids[2:], pool_addresses[2:]),
+        ]:
+            txn_group += [
+                transaction.AssetTransferTxn(
+                    sender=self.user_addr,
+                    sp=self.sp,
+                    receiver=SWAP_ROUTER_ADDRESS,
+                    amt=1000,
+                    index=input_asset_id
+                ),
+                transaction.ApplicationNoOpTxn(
+                    sender=self.user_addr,
+                    sp=self.sp,
+                    index=SWAP_ROUTER_APP_ID,
+                    app_args=["swap", "fixed-input", 1],
+                    accounts=accounts,
+                    foreign_apps=[AMM_APPLICATION_ID],
+                    foreign_assets=asset_ids,
+                ),
+            ]
+        txn_group[1].fee = 1000 + 7000
+        txn_group[3].fee = 1000 + 4000
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        inner_transactions = txns[1][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 7)
+        self.assertEqual(inner_transactions[6][b'txn'][b'aamt'], 9915)
+        self.assertEqual(inner_transactions[6][b'txn'][b'xaid'], self.asset_c_id)
+
+        inner_transactions = txns[3][b'dt'][b'itx']
+        self.assertEqual(len(inner_transactions), 4)
+        self.assertEqual(inner_transactions[3][b'txn'][b'aamt'], 2988)
+        self.assertEqual(inner_transactions[3][b'txn'][b'xaid'], self.asset_d_id)
+
 
 class ClaimExtraTestCase(SwapRouterTestCase):
 
@@ -897,6 +2142,111 @@ class ClaimExtraTestCase(SwapRouterTestCase):
             }
         )
 
+    def test_claim_extra_with_multiple_app_calls(self):
+        self.ledger.set_account_balance(address=SWAP_ROUTER_ADDRESS, asset_id=self.asset_a_id, balance=900_000)
+        self.ledger.set_account_balance(address=SWAP_ROUTER_ADDRESS, asset_id=self.asset_b_id, balance=0)
+        self.ledger.set_account_balance(address=SWAP_ROUTER_ADDRESS, asset_id=self.asset_c_id, balance=500_000)
+
+        extra_collector = self.app_creator_address
+        self.ledger.set_account_balance(address=extra_collector, asset_id=0, balance=1_000_000)
+        self.ledger.opt_in_asset(address=extra_collector, asset_id=self.asset_a_id)
+        self.ledger.opt_in_asset(address=extra_collector, asset_id=self.asset_b_id)
+        self.ledger.opt_in_asset(address=extra_collector, asset_id=self.asset_c_id)
+
+        txn_group = [
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["claim_extra"],
+                foreign_assets=[self.asset_a_id, self.asset_b_id],
+                accounts=[extra_collector]
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["claim_extra"],
+                foreign_assets=[self.asset_c_id],
+                accounts=[extra_collector]
+            )
+        ]
+        txn_group[0].fee = 2000 + 2000
+        txn_group[1].fee = 0
+
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+        block = self.ledger.eval_transactions(stxns)
+        txns = block[b'txns']
+
+        self.assertEqual([(itxn[b'txn'][b'xaid'], itxn[b'txn'][b'aamt']) for itxn in txns[0][b'dt'][b'itx']], [(self.asset_a_id, 900_000)])
+        self.assertEqual([(itxn[b'txn'][b'xaid'], itxn[b'txn'][b'aamt']) for itxn in txns[1][b'dt'][b'itx']], [(self.asset_c_id, 500_000)])
+
+    def test_claim_extra_with_arc4_and_raw_app_calls(self):
+        self.ledger.set_account_balance(address=SWAP_ROUTER_ADDRESS, asset_id=self.asset_a_id, balance=900_000)
+        self.ledger.set_account_balance(address=SWAP_ROUTER_ADDRESS, asset_id=self.asset_c_id, balance=500_000)
+
+        extra_collector = self.app_creator_address
+        self.ledger.set_account_balance(address=extra_collector, asset_id=0, balance=1_000_000)
+        self.ledger.opt_in_asset(address=extra_collector, asset_id=self.asset_a_id)
+        self.ledger.opt_in_asset(address=extra_collector, asset_id=self.asset_c_id)
+
+        for app_args in [
+            [[get_selector("claim_extra()void")], ["claim_extra"]],
+            [["claim_extra"], [get_selector("claim_extra()void")]],
+        ]:
+            with self.subTest(app_args=app_args):
+                txn_group = [
+                    transaction.ApplicationNoOpTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        index=SWAP_ROUTER_APP_ID,
+                        app_args=app_args[0],
+                        foreign_assets=[self.asset_a_id],
+                        accounts=[extra_collector]
+                    ),
+                    transaction.ApplicationNoOpTxn(
+                        sender=self.user_addr,
+                        sp=self.sp,
+                        index=SWAP_ROUTER_APP_ID,
+                        app_args=app_args[1],
+                        foreign_assets=[self.asset_c_id],
+                        accounts=[extra_collector]
+                    )
+                ]
+                txn_group[0].fee = 2000 + 2000
+                txn_group[1].fee = 0
+
+                stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+                self.ledger.eval_transactions(stxns)
+
+    def test_claim_extra_after_another_transaction(self):
+        self.ledger.set_account_balance(address=SWAP_ROUTER_ADDRESS, asset_id=self.asset_a_id, balance=900_000)
+        self.ledger.set_account_balance(address=self.user_addr, asset_id=self.asset_a_id, balance=1_000)
+
+        txn_group = [
+            transaction.AssetTransferTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                receiver=SWAP_ROUTER_ADDRESS,
+                amt=1_000,
+                index=self.asset_a_id
+            ),
+            transaction.ApplicationNoOpTxn(
+                sender=self.user_addr,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                app_args=["claim_extra"],
+                foreign_assets=[self.asset_a_id],
+                accounts=[self.app_creator_address]
+            )
+        ]
+        txn_group[1].fee = 1000 + 1000
+
+        stxns = self.sign_txns(transaction.assign_group_id(txn_group), self.user_sk)
+        with self.assertRaises(LogicEvalError) as e:
+            self.ledger.eval_transactions(stxns)
+        self.assertEqual(e.exception.source['line'], 'assert(Gtxn[i].ApplicationID == Global.CurrentApplicationID)')
+
     def test_claim_extra_with_new_collector_address(self):
         new_extra_collector_sk, new_extra_collector_address = generate_account()
 
@@ -1123,6 +2473,38 @@ class SetManagerTestCase(SwapRouterTestCase):
             }
         )
 
+    def test_arc4_set_manager(self):
+        new_manager_sk, new_manager_address = generate_account()
+
+        txn_group = [
+            transaction.ApplicationNoOpTxn(
+                sender=self.app_creator_address,
+                sp=self.sp,
+                index=SWAP_ROUTER_APP_ID,
+                # The account argument is the index of the account in the foreign accounts array.
+                app_args=[get_selector("set_manager(account)void"), 2],
+                accounts=[self.app_creator_address, new_manager_address]
+            )
+        ]
+
+        txn_group = transaction.assign_group_id(txn_group)
+        stxn = txn_group[0].sign(self.app_creator_sk)
+
+        block = self.ledger.eval_transactions([stxn])
+        txn = block[b'txns'][0]
+
+        self.assertDictEqual(
+            txn[b'dt'],
+            {
+                b'gd': {
+                    b'manager': {
+                        b'at': 1,
+                        b'bs': decode_address(new_manager_address)
+                    }
+                }
+            }
+        )
+
 
 class SetExtraCollectorTestCase(SwapRouterTestCase):
 
@@ -0,0 +1,113 @@
+from unittest import TestCase
+
+from algosdk.account import generate_account
+from algosdk.future import transaction
+
+from swap_router.quote import FIXED_INPUT, FIXED_OUTPUT
+from swap_router.transactions import (
+    ARBITRAGE, FIXED_INPUT_SPLIT, FIXED_OUTPUT_TOLERANT, get_batch_swap_app_call_fee, get_opt_in_count, get_swap_app_call_fee,
+    prepare_swap_transactions, sign_transactions
+)
+
+SWAP_ROUTER_APP_ID = 20
+AMM_APPLICATION_ID = 1
+
+
+class SwapFeeTestCase(TestCase):
+
+    def test_swap_app_call_fee(self):
+        # The fees of the swap router tests.
+        self.assertEqual(get_swap_app_call_fee(FIXED_INPUT, 1), 1000 + 4000)
+        self.assertEqual(get_swap_app_call_fee(FIXED_INPUT, 3), 1000 + 10000)
+        self.assertEqual(get_swap_app_call_fee(FIXED_OUTPUT, 3, has_change=True), 1000 + 11000)
+        self.assertEqual(get_swap_app_call_fee(FIXED_OUTPUT, 3, has_change=False), 1000 + 10000)
+        self.assertEqual(get_swap_app_call_fee(FIXED_INPUT_SPLIT, 3), 1000 + 10000)
+        self.assertEqual(get_swap_app_call_fee(ARBITRAGE, 3), 1000 + 10000)
+        self.assertEqual(get_swap_app_call_fee(FIXED_INPUT, 3, opt_in_count=1, min_fee=2000), 2 * (1000 + 11000))
+
+    def test_batch_swap_app_call_fee(self):
+        self.assertEqual(get_batch_swap_app_call_fee([(FIXED_INPUT, 2, False), (FIXED_OUTPUT, 1, True)]), 1000 + 12000)
+
+    def test_opt_in_count(self):
+        self.assertEqual(get_opt_in_count([0, 10, 7, 10], opted_in_asset_ids={7}), 1)
+
+
+class PrepareSwapTransactionsTestCase(TestCase):
+
+    def test_prepare_swap_transactions(self):
+        user_sk, user_address = generate_account()
+        _, pool_address = generate_account()
+        sp = transaction.SuggestedParams(fee=0, first=1, last=1000, gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", min_fee=1000)
+
+        txn_group = prepare_swap_transactions(
+            sender=user_address,
+            suggested_params=sp,
+            router_app_id=SWAP_ROUTER_APP_ID,
+            amm_app_id=AMM_APPLICATION_ID,
+            route_asset_ids=[0, 10],
+            pool_addresses=[pool_address],
+            mode=FIXED_OUTPUT,
+            input_amount=1000,
+            amount=9000,
+        )
+        input_txn, app_call_txn = txn_group
+        self.assertIsInstance(input_txn, transaction.PaymentTxn)
+        self.assertEqual(input_txn.fee, 1000)
+        self.assertEqual(app_call_txn.fee, 1000 + 5000)
+        self.assertEqual(app_call_txn.app_args, [b"swap", b"fixed-output", (9000).to_bytes(8, "big")])
+        self.assertEqual(input_txn.group, app_call_txn.group)
+        self.assertFalse(sp.flat_fee)
+
+        signed_txn_groups = sign_transactions([txn_group], user_sk)
+        self.assertEqual(len(signed_txn_groups[0]), 2)
+
+    def test_prepare_swap_transactions_without_change(self):
+        _, user_address = generate_account()
+        _, pool_address = generate_account()
+        sp = transaction.SuggestedParams(fee=0, first=1, last=1000, gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", min_fee=1000)
+
+        for mode, has_change, fee in [
+            (FIXED_OUTPUT_TOLERANT, None, 1000 + 5000),
+            (FIXED_OUTPUT, False, 1000 + 4000),
+            (FIXED_INPUT, None, 1000 + 4000),
+        ]:
+            with self.subTest(mode=mode, has_change=has_change):
+                _, app_call_txn = prepare_swap_transactions(
+                    sender=user_address,
+                    suggested_params=sp,
+                    router_app_id=SWAP_ROUTER_APP_ID,
+                    amm_app_id=AMM_APPLICATION_ID,
+                    route_asset_ids=[0, 10],
+                    pool_addresses=[pool_address],
+                    mode=mode,
+                    input_amount=1000,
+                    amount=9000,
+                    has_change=has_change,
+                )
+                self.assertEqual(app_call_txn.fee, fee)
+
+    def test_prepare_swap_transactions_with_opt_in(self):
+        _, user_address = generate_account()
+        _, pool_address = generate_account()
+        sp = transaction.SuggestedParams(fee=0, first=1, last=1000, gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", min_fee=1000)
+
+        txn_group = prepare_swap_transactions(
+            sender=user_address,
+            suggested_params=sp,
+            router_app_id=SWAP_ROUTER_APP_ID,
+            amm_app_id=AMM_APPLICATION_ID,
+            route_asset_ids=[10, 7],
+            pool_addresses=[pool_address],
+            mode=FIXED_INPUT,
+            input_amount=1000,
+            amount=1,
+            opt_in_count=2,
+        )
+        # The minimum balance increase is transferred before the input transaction.
+        funding_txn, input_txn, app_call_txn = txn_group
+        self.assertIsInstance(funding_txn, transaction.PaymentTxn)
+        self.assertEqual(funding_txn.amt, 200_000)
+        self.assertEqual(funding_txn.receiver, input_txn.receiver)
+        self.assertIsInstance(input_txn, transaction.AssetTransferTxn)
+        self.assertEqual(app_call_txn.fee, 1000 + 6000)
+        self.assertEqual(len({txn.group for txn in txn_group}), 1)
@@ -0,0 +1,80 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from swap_router import quote
+from swap_router.vectorized import quote_fixed_input, quote_fixed_output
+
+TOTAL_FEE_SHARE = 30
+
+# The same pools with the swap router tests.
+THREE_HOP_ROUTE = [
+    (1_000_000, 2_000_000, TOTAL_FEE_SHARE),
+    (1_000_000, 5_000_000, TOTAL_FEE_SHARE),
+    (1_000_000, 3_000_000, TOTAL_FEE_SHARE),
+]
+
+
+def get_scalar_quote(quote_function, hops, amount, *args):
+    try:
+        return quote_function(hops, amount, *args)
+    except quote.SwapError:
+        return None
+
+
+class VectorizedQuoteTestCase(TestCase):
+
+    def assertBatchQuoteEqual(self, batch_quote, scalar_quotes):
+        self.assertEqual(batch_quote.valid.tolist(), [q is not None for q in scalar_quotes])
+        for i, scalar_quote in enumerate(scalar_quotes):
+            if scalar_quote is not None:
+                self.assertEqual(
+                    (int(batch_quote.input_amounts[i]), int(batch_quote.output_amounts[i]), int(batch_quote.change_amounts[i]), [int(a) for a in batch_quote.route_amounts[:, i]]),
+                    tuple(scalar_quote),
+                )
+
+    def test_quote(self):
+        result = quote_fixed_input(THREE_HOP_ROUTE, [1000, 2000])
+        self.assertEqual(result.route_amounts[:, 0].tolist(), [1000, 1992, 9915, 29367])
+        self.assertEqual(result.valid.tolist(), [True, True])
+
+        result = quote_fixed_output(THREE_HOP_ROUTE, [29000, 29367], input_amounts=[1000, 1000])
+        self.assertEqual(result.input_amounts.tolist(), [987, 1000])
+        self.assertEqual(result.change_amounts.tolist(), [13, 0])
+
+    def test_pool_arrays(self):
+        # Each amount is quoted with its own pool state.
+        hops = [(np.array([1_000_000, 2_000_000]), np.array([10_000_000, 20_000_000]), TOTAL_FEE_SHARE)]
+        result = quote_fixed_input(hops, [1000, 1000])
+        self.assertEqual(result.output_amounts.tolist(), [quote.quote_fixed_input([(1_000_000, 10_000_000, 30)], 1000).output_amount, quote.quote_fixed_input([(2_000_000, 20_000_000, 30)], 1000).output_amount])
+
+    def test_exact_with_large_reserves(self):
+        # The products of the reserves don't fit in uint64.
+        rng = random.Random(1)
+        for _ in range(20):
+            hops = [(rng.randrange(1, 2 ** 63), rng.randrange(1, 2 ** 63), rng.choice([1, 25, 30, 100])) for _ in range(rng.randrange(1, 4))]
+            amounts = [rng.randrange(1, 2 ** rng.randrange(1, 64)) for _ in range(50)]
+            with self.subTest(hops=hops):
+                self.assertBatchQuoteEqual(
+                    quote_fixed_input(hops, amounts),
+                    [get_scalar_quote(quote.quote_fixed_input, hops, amount) for amount in amounts],
+                )
+                self.assertBatchQuoteEqual(
+                    quote_fixed_output(hops, amounts, input_amounts=[2 ** 64 - 1] * len(amounts)),
+                    [get_scalar_quote(quote.quote_fixed_output, hops, amount, 2 ** 64 - 1) for amount in amounts],
+                )
+
+    def test_empty_pools(self):
+        # The pools without reserves fail in both implementations, the scalar quote raises SwapError.
+        for hops in [[(0, 0, TOTAL_FEE_SHARE)], [(0, 1_000_000, TOTAL_FEE_SHARE)], [(1_000_000, 0, TOTAL_FEE_SHARE)], THREE_HOP_ROUTE + [(0, 0, TOTAL_FEE_SHARE)]]:
+            amounts = [0, 1, 1000]
+            with self.subTest(hops=hops):
+                self.assertBatchQuoteEqual(
+                    quote_fixed_input(hops, amounts),
+                    [get_scalar_quote(quote.quote_fixed_input, hops, amount) for amount in amounts],
+                )
+                self.assertBatchQuoteEqual(
+                    quote_fixed_output(hops, amounts),
+                    [get_scalar_quote(quote.quote_fixed_output, hops, amount) for amount in amounts],
+                )